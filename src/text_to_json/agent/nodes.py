@@ -12,7 +12,7 @@ from text_to_json.settings import get_settings
 from text_to_json.misc.truncator import Truncator, TruncatorConfig
 from text_to_json.tools.apply_patches import apply_patches
 from text_to_json.tools.inspect_keys import inspect_keys
-from text_to_json.tools.json_pointer import parse_json_pointer_lenient
+from text_to_json.tools.json_pointer import decode_pointer_token
 from text_to_json.tools.read_value import read_value
 from text_to_json.tools.search_pointer import search_pointer
 from text_to_json.tools.update_guidance import update_guidance
@@ -42,6 +42,7 @@ def _get_truncator() -> Truncator:
             ellipsis_size=s.TRUNCATE_ELLIPSIS_SIZE,
             min_items_for_collapse=s.TRUNCATE_MIN_ARRAY_ITEMS,
             min_keys_for_collapse=s.TRUNCATE_MIN_OBJECT_KEYS,
+            max_depth=s.TRUNCATE_MAX_DEPTH,
         )
     )
 
@@ -169,60 +170,38 @@ def _trim_messages(
     Returns the trimmed list, or ``None`` if there are not enough rounds
     to trim (caller should treat None as "trimming won't help").
     """
-    # ── 1. Separate prefix (before first AIMessage) from the rest ──
-    prefix: list[BaseMessage] = []
-    rest: list[BaseMessage] = []
-    hit_ai = False
-
-    for msg in messages:
-        if not hit_ai and isinstance(msg, AIMessage):
-            hit_ai = True
-        if hit_ai:
-            rest.append(msg)
-        else:
-            prefix.append(msg)
-
-    # ── 2. Group rest into rounds (AIMessage + consecutive ToolMessages) ──
-    rounds: list[list[BaseMessage]] = []
-    current_round: list[BaseMessage] = []
-
-    for msg in rest:
-        if isinstance(msg, AIMessage) and current_round:
-            rounds.append(current_round)
-            current_round = [msg]
-        else:
-            current_round.append(msg)
-    if current_round:
-        rounds.append(current_round)
-
-    if len(rounds) <= keep_last_n_rounds:
+    # ── 1. Locate round boundaries (every round starts with an AIMessage) ──
+    ai_positions = [
+        i for i, msg in enumerate(messages) if isinstance(msg, AIMessage)
+    ]
+    if len(ai_positions) <= keep_last_n_rounds:
         return None  # Not enough rounds to trim
 
-    # ── 3. Build clean prefix (SystemMessage + first HumanMessage only) ──
+    # ── 2. Build clean prefix (SystemMessage + first HumanMessage only) ──
     #    Skips any previously injected summary HumanMessages.
     clean_prefix: list[BaseMessage] = []
     found_human = False
 
-    for msg in prefix:
+    for msg in messages[: ai_positions[0]]:
         if isinstance(msg, SystemMessage):
             clean_prefix.append(msg)
         elif isinstance(msg, HumanMessage) and not found_human:
             clean_prefix.append(msg)
             found_human = True
 
-    # ── 4. Assemble trimmed list ──
-    kept_rounds = rounds[-keep_last_n_rounds:]
-    removed_count = len(rounds) - keep_last_n_rounds
+    # ── 3. Assemble trimmed list: prefix + summary + last N rounds ──
+    cut = (
+        ai_positions[-keep_last_n_rounds]
+        if keep_last_n_rounds > 0
+        else len(messages)
+    )
+    removed_count = len(ai_positions) - keep_last_n_rounds
 
     summary = HumanMessage(
         content=_TRIM_SUMMARY.format(removed=removed_count)
     )
 
-    trimmed: list[BaseMessage] = list(clean_prefix) + [summary]
-    for rnd in kept_rounds:
-        trimmed.extend(rnd)
-
-    return trimmed
+    return clean_prefix + [summary] + messages[cut:]
 
 
 def _extract_token_usage(*responses: BaseMessage) -> dict[str, int]:
@@ -360,6 +339,9 @@ def execute_tools_node(state: AgentState) -> dict[str, Any]:
     new_document = document
     is_finalized = False
     new_guidance = state.get("guidance", {})
+    # Leaf count of new_document, carried across apply_patches calls so the
+    # shrinkage guard only has to count the candidate document.
+    doc_count: int | None = None
 
     settings = get_settings()
     truncator = _get_truncator()
@@ -380,7 +362,9 @@ def execute_tools_node(state: AgentState) -> dict[str, Any]:
                     candidate = result.get("finalDoc", new_document)
                     # Post-patch shrinkage guard: reject if document
                     # lost significant content after the patch
-                    old_count = _count_nested_items(new_document)
+                    if doc_count is None:
+                        doc_count = _count_nested_items(new_document)
+                    old_count = doc_count
                     new_count = _count_nested_items(candidate)
                     if (
                         old_count > SHRINKAGE_GUARD_MIN_ITEMS
@@ -409,6 +393,7 @@ def execute_tools_node(state: AgentState) -> dict[str, Any]:
                         }
                     else:
                         new_document = candidate
+                        doc_count = new_count
 
             elif name == "update_guidance":
                 new_guidance = result.get("guidance", new_guidance)
@@ -456,46 +441,68 @@ def _resolve_path(document: Any, path: str) -> tuple[bool, Any]:
     """
     if not path or path == "/":
         return True, document
-    try:
-        tokens = parse_json_pointer_lenient(path)
-    except ValueError:
+    if not isinstance(path, str):
         return False, None
+    # Same leniency as parse_json_pointer_lenient: a missing leading "/" is
+    # tolerated. Tokens are only unescaped when they contain "~".
+    tokens = (path[1:] if path[0] == "/" else path).split("/")
     current = document
     for t in tokens:
-        if isinstance(current, dict) and t in current:
+        if "~" in t:
+            t = decode_pointer_token(t)
+        tc = type(current)
+        if tc is dict:
+            if t not in current:
+                return False, None
             current = current[t]
-        elif isinstance(current, list):
-            if t == "-":
+        elif tc is list:
+            # isdigit() alone admits non-ASCII digits that int() rejects.
+            if not (t.isascii() and t.isdigit()):
                 return False, None
-            try:
-                idx = int(t)
-                if 0 <= idx < len(current):
-                    current = current[idx]
-                else:
-                    return False, None
-            except ValueError:
+            idx = int(t)
+            if idx >= len(current):
                 return False, None
+            current = current[idx]
         else:
             return False, None
     return True, current
 
 
 def _count_nested_items(value: Any) -> int:
-    """Count the total number of leaf values inside a nested structure."""
-    if isinstance(value, dict):
-        return sum(_count_nested_items(v) for v in value.values())
-    if isinstance(value, list):
-        return sum(_count_nested_items(v) for v in value)
-    return 1
+    """Count the total number of leaf values inside a nested structure.
+
+    Walks the tree with an explicit stack; empty containers count as zero.
+    """
+    count = 0
+    stack = [value]
+    pop = stack.pop
+    extend = stack.extend
+    while stack:
+        node = pop()
+        t = type(node)
+        if t is dict:
+            extend(node.values())
+        elif t is list:
+            extend(node)
+        else:
+            count += 1
+    return count
 
 
 def _make_error(
-    index: int, patch: dict, path: str, message: str
+    index: int, patch: dict, path: str, code: str, message: str
 ) -> dict[str, Any]:
+    """Build a pre-validation error.
+
+    ``code`` is a short stable tag (e.g. ``"DESTRUCTIVE_REPLACE"``) for
+    callers that branch on the kind of error; ``message`` is the prescriptive
+    text shown to the model.
+    """
     return {
         "opIndex": index,
         "op": patch,
         "pointer": path,
+        "code": code,
         "message": message,
     }
 
@@ -579,9 +586,9 @@ def _check_invalid_path(
     i: int, patch: dict, path: str,
 ) -> dict[str, Any] | None:
     """Check 1: path must start with '/'."""
-    if path and not path.startswith("/"):
+    if path and path[:1] != "/":
         return _make_error(
-            i, patch, path,
+            i, patch, path, "INVALID_POINTER",
             f'Invalid JSON Pointer: "{path}" must start with "/". '
             f'Did you mean "/{path}"?',
         )
@@ -601,7 +608,7 @@ def _check_add_on_existing_array(
     n = len(current)
     if isinstance(value, list):
         return _make_error(
-            i, patch, path,
+            i, patch, path, "DESTRUCTIVE_OVERWRITE",
             f'DESTRUCTIVE OVERWRITE: "{path}" already contains an '
             f"array with {n} items. Your \"add\" would REPLACE ALL "
             f"existing data with a new array of {len(value)} items. "
@@ -610,7 +617,7 @@ def _check_add_on_existing_array(
         )
     if isinstance(value, dict):
         return _make_error(
-            i, patch, path,
+            i, patch, path, "DESTRUCTIVE_OVERWRITE",
             f'DESTRUCTIVE OVERWRITE: "{path}" already contains an '
             f"array with {n} items. Your \"add\" would REPLACE the "
             f"entire array with a single object. "
@@ -619,7 +626,7 @@ def _check_add_on_existing_array(
         )
     # Scalar value replacing an array
     return _make_error(
-        i, patch, path,
+        i, patch, path, "TYPE_DOWNGRADE",
         f'TYPE DOWNGRADE: "{path}" already contains an '
         f"array with {n} items. Your \"add\" would REPLACE "
         f"the entire array with a {type(value).__name__}. "
@@ -635,7 +642,7 @@ def _check_add_at_root(
     item_count = _count_nested_items(document)
     if item_count > 0:
         return _make_error(
-            i, patch, path,
+            i, patch, path, "DESTRUCTIVE_ROOT_ADD",
             f"DESTRUCTIVE: \"add\" at root would REPLACE the entire "
             f"document ({item_count} existing values). "
             f"Add to specific paths instead (e.g., /metadata, /sections/-).",
@@ -655,7 +662,7 @@ def _check_replace_container(
 
     if isinstance(current, list) and len(current) > 0:
         return _make_error(
-            i, patch, path,
+            i, patch, path, "DESTRUCTIVE_REPLACE",
             f'DESTRUCTIVE REPLACE: "{path}" is an array with '
             f"{len(current)} items. Replacing it would DISCARD all "
             f"existing data. To update specific items, use "
@@ -666,7 +673,7 @@ def _check_replace_container(
         nested = _count_nested_items(current)
         if isinstance(value, (str, int, float, bool)) or value is None:
             return _make_error(
-                i, patch, path,
+                i, patch, path, "TYPE_DOWNGRADE",
                 f'TYPE DOWNGRADE: "{path}" is an object with '
                 f"{len(current)} keys ({nested} nested values). "
                 f"Replacing it with a {type(value).__name__} would "
@@ -678,7 +685,7 @@ def _check_replace_container(
             new_count = _count_nested_items(value)
             if new_count < old_count * SHRINKAGE_GUARD_RATIO and old_count > DATA_LOSS_MIN_ITEMS:
                 return _make_error(
-                    i, patch, path,
+                    i, patch, path, "SIGNIFICANT_DATA_LOSS",
                     f'SIGNIFICANT DATA LOSS: replacing "{path}" '
                     f"would reduce content from {old_count} to "
                     f"{new_count} values ({100 - int(new_count / old_count * 100)}% loss). "
@@ -701,7 +708,7 @@ def _check_remove_container(
 
     if isinstance(current, list) and len(current) > 0:
         return _make_error(
-            i, patch, path,
+            i, patch, path, "DATA_LOSS_WARNING",
             f'DATA LOSS WARNING: removing "{path}" would delete '
             f"an array with {len(current)} items ({nested} total "
             f"nested values). If you need to remove specific items, "
@@ -713,7 +720,7 @@ def _check_remove_container(
         and path_depth <= 3
     ):
         return _make_error(
-            i, patch, path,
+            i, patch, path, "DATA_LOSS_WARNING",
             f'DATA LOSS WARNING: removing "{path}" would delete '
             f"an object with {len(current)} keys ({nested} total "
             f"nested values). If you need to remove specific fields, "
@@ -738,7 +745,7 @@ def _check_type_downgrade(
         if nested > 1:
             ctype = "array" if isinstance(current, list) else "object"
             return _make_error(
-                i, patch, path,
+                i, patch, path, "TYPE_DOWNGRADE",
                 f'TYPE DOWNGRADE: "{path}" is a {ctype} with '
                 f"{nested} nested values. Replacing it with a "
                 f"{type(value).__name__} ({repr(value)[:60]}) would "
@@ -762,50 +769,36 @@ def _pre_validate_patches(
     for i, patch in enumerate(patches):
         if not isinstance(patch, dict):
             continue
-        op = patch.get("op")
-        path = patch.get("path", "")
-        value = patch.get("value")
+        get = patch.get
+        op = get("op")
+        path = get("path", "")
+        value = get("value")
 
         # 1. Invalid path format
         err = _check_invalid_path(i, patch, path)
-        if err:
-            errors.append(err)
-            continue
 
-        # 2. "add" on existing array → destructive overwrite
-        if op == "add":
-            err = _check_add_on_existing_array(i, patch, path, value, document)
-            if err:
-                errors.append(err)
-                continue
-
-        # 3. "add" at root → replaces entire document
-        if op == "add" and (path == "" or path == "/"):
-            err = _check_add_at_root(i, patch, path, document)
-            if err:
-                errors.append(err)
-                continue
-
-        # 4. "replace" on a container
-        if op == "replace":
-            err = _check_replace_container(i, patch, path, value, document)
-            if err:
-                errors.append(err)
-                continue
-
-        # 5. "remove" on a container with significant data
-        if op == "remove":
-            err = _check_remove_container(i, patch, path, document)
-            if err:
-                errors.append(err)
-                continue
-
-        # 6. Type downgrade (scalar replacing container)
-        if op in ("add", "replace"):
-            err = _check_type_downgrade(i, patch, path, value, document)
-            if err:
-                errors.append(err)
-                continue
+        if err is None:
+            if op == "add":
+                # 2. "add" on existing array → destructive overwrite
+                err = _check_add_on_existing_array(i, patch, path, value, document)
+                # 3. "add" at root → replaces entire document
+                if err is None and (path == "" or path == "/"):
+                    err = _check_add_at_root(i, patch, path, document)
+                # 6. Type downgrade (scalar replacing container)
+                if err is None:
+                    err = _check_type_downgrade(i, patch, path, value, document)
+            elif op == "replace":
+                # 4. "replace" on a container
+                err = _check_replace_container(i, patch, path, value, document)
+                # 6. Type downgrade (scalar replacing container)
+                if err is None:
+                    err = _check_type_downgrade(i, patch, path, value, document)
+            elif op == "remove":
+                # 5. "remove" on a container with significant data
+                err = _check_remove_container(i, patch, path, document)
+
+        if err is not None:
+            errors.append(err)
 
     return errors
 
@@ -15,6 +15,7 @@ def _get_truncator() -> Truncator:
             ellipsis_size=s.TRUNCATE_ELLIPSIS_SIZE,
             min_items_for_collapse=s.TRUNCATE_MIN_ARRAY_ITEMS,
             min_keys_for_collapse=s.TRUNCATE_MIN_OBJECT_KEYS,
+            max_depth=s.TRUNCATE_MAX_DEPTH,
         )
     )
 
@@ -15,11 +15,25 @@ def messages_reducer(
     a new chat session (new chunk) and replaces all messages.
     Otherwise, uses the default behavior of adding messages.
     """
-    if new and isinstance(new[0], SystemMessage):
+    if not new:
+        return current
+    if isinstance(new[0], SystemMessage):
         return new
     return add_messages(current, new)
 
 
+# Counters accumulated by token_usage_reducer; every merged result carries
+# all of them so consumers can index without defaults.
+_TOKEN_KEYS: tuple[str, ...] = (
+    "input_tokens",
+    "output_tokens",
+    "total_tokens",
+    "llm_calls",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
 def token_usage_reducer(
     current: dict[str, int], new: dict[str, int]
 ) -> dict[str, int]:
@@ -28,20 +42,9 @@ def token_usage_reducer(
         current = {}
     if not new:
         return current
-    return {
-        "input_tokens": current.get("input_tokens", 0) + new.get("input_tokens", 0),
-        "output_tokens": current.get("output_tokens", 0) + new.get("output_tokens", 0),
-        "total_tokens": current.get("total_tokens", 0) + new.get("total_tokens", 0),
-        "llm_calls": current.get("llm_calls", 0) + new.get("llm_calls", 0),
-        "cache_creation_input_tokens": (
-            current.get("cache_creation_input_tokens", 0)
-            + new.get("cache_creation_input_tokens", 0)
-        ),
-        "cache_read_input_tokens": (
-            current.get("cache_read_input_tokens", 0)
-            + new.get("cache_read_input_tokens", 0)
-        ),
-    }
+    current_get = current.get
+    new_get = new.get
+    return {key: current_get(key, 0) + new_get(key, 0) for key in _TOKEN_KEYS}
 
 
 class Guidance(TypedDict, total=False):
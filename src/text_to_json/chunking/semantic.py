@@ -44,9 +44,10 @@ def semantic_chunk(
         breakpoint_threshold_amount=breakpoint_threshold_amount,
     )
 
-    documents = chunker.create_documents([text])
-
-    chunks = [doc.page_content for doc in documents]
+    # split_text yields the chunk strings directly; create_documents would
+    # wrap each one in a Document with a deep-copied metadata dict only for
+    # us to unwrap it again.
+    chunks = chunker.split_text(text)
 
     filtered_chunks = _merge_small_chunks(chunks, min_chunk_size)
 
@@ -58,25 +59,30 @@ def _merge_small_chunks(chunks: list[str], min_size: int) -> list[str]:
     if not chunks:
         return []
 
-    result = []
-    buffer = ""
-
-    for chunk in chunks:
-        if buffer:
-            combined = buffer + "\n\n" + chunk
-            if len(buffer) < min_size:
-                buffer = combined
-            else:
-                result.append(buffer)
-                buffer = chunk
+    result: list[str] = []
+    lens = list(map(len, chunks))
+    # The chunk being built is chunks[start:i], whose "\n\n" join is
+    # buffer_len characters long; it is assembled with a single join.
+    start = 0
+    buffer_len = 0
+
+    for i, size in enumerate(lens):
+        if not buffer_len:
+            start = i
+            buffer_len = size
+        elif buffer_len < min_size:
+            buffer_len += 2 + size
         else:
-            buffer = chunk
-
-    if buffer:
-        if result and len(buffer) < min_size:
-            result[-1] = result[-1] + "\n\n" + buffer
+            result.append("\n\n".join(chunks[start:i]))
+            start = i
+            buffer_len = size
+
+    if buffer_len:
+        merged = "\n\n".join(chunks[start:])
+        if result and buffer_len < min_size:
+            result[-1] = result[-1] + "\n\n" + merged
         else:
-            result.append(buffer)
+            result.append(merged)
 
     return result
 
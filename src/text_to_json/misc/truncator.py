@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import json
-import copy
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -9,6 +8,9 @@ from typing import Any
 # Sentinel value used internally to mark truncated locations.
 _TRUNCATION_TOKEN = "__TRUNCATED__"
 
+# Placeholder for containers nested deeper than ``TruncatorConfig.max_depth``.
+_MAX_DEPTH_TOKEN = "[~MaxDepth]"
+
 
 @dataclass(frozen=True)
 class TruncatorConfig:
@@ -19,6 +21,8 @@ class TruncatorConfig:
     ellipsis_size: int = 3
     min_items_for_collapse: int = 2
     min_keys_for_collapse: int = 2
+    # Only applied to data that exceeds the limit; None disables it.
+    max_depth: int | None = 6
 
 
 @dataclass
@@ -42,6 +46,7 @@ class Truncator:
 
     def __init__(self, config: TruncatorConfig | None = None) -> None:
         self._cfg = config or TruncatorConfig()
+        self._indent_str = " " * self._cfg.indentation
 
     # ------------------------------------------------------------------
     # Public API
@@ -55,8 +60,9 @@ class Truncator:
         """
         if data is None:
             return "null"
-        working = copy.deepcopy(data)
-        result = self._smart_truncate(working, limit)
+        # Every strategy rebuilds the containers it changes (see _set_in),
+        # so the caller's data is never mutated and needs no defensive copy.
+        result = self._smart_truncate(data, limit)
         text = self._custom_stringify(result)
         return text.replace("...,\n", "...\n")
 
@@ -64,53 +70,72 @@ class Truncator:
     # Custom stringify
     # ------------------------------------------------------------------
 
-    def _custom_stringify(self, data: Any, indent_level: int = 0) -> str:
-        indent_str = " " * self._cfg.indentation
-        indent = indent_str * indent_level
-
+    def _custom_stringify(
+        self,
+        data: Any,
+        indent_level: int = 0,
+        memo: dict[tuple[int, int], tuple[Any, str]] | None = None,
+    ) -> str:
+        """Format *data* as indented JSON with ``...`` truncation markers.
+
+        *memo* maps ``(id(container), indent_level)`` to the container and
+        its text. Truncation rounds rebuild only the containers on the path
+        to a change, so every other subtree keeps its identity and is
+        formatted once per ``truncate_with_limit`` call. The container is
+        stored alongside its text to keep the id from being reused.
+        """
+        if memo is not None and isinstance(data, (list, dict)):
+            key = (id(data), indent_level)
+            hit = memo.get(key)
+            if hit is not None:
+                return hit[1]
+            text = self._format(data, indent_level, memo)
+            memo[key] = (data, text)
+            return text
+        return self._format(data, indent_level, memo)
+
+    def _format(
+        self,
+        data: Any,
+        indent_level: int,
+        memo: dict[tuple[int, int], tuple[Any, str]] | None,
+    ) -> str:
         if data == _TRUNCATION_TOKEN:
             return "..."
 
-        if isinstance(data, list):
-            if len(data) == 0:
-                return "[]"
-            if len(data) == 1 and data[0] == _TRUNCATION_TOKEN:
-                return "[...]"
+        is_list = isinstance(data, list)
+        if is_list or isinstance(data, dict):
+            if not data:
+                return "[]" if is_list else "{}"
+            if len(data) == 1 and next(iter(data)) == _TRUNCATION_TOKEN:
+                return "[...]" if is_list else "{...}"
+
+            indent = self._indent_str * indent_level
+            child_indent = indent + self._indent_str
+            child_level = indent_level + 1
+            stringify = self._custom_stringify
+            # Child texts never carry surrounding whitespace (containers
+            # start with a bracket, primitives come from json.dumps), so
+            # they are used without stripping.
+            parts: list[str] = []
+            append = parts.append
+
+            if is_list:
+                for item in data:
+                    if item == _TRUNCATION_TOKEN:
+                        append(child_indent + "...")
+                    else:
+                        append(child_indent + stringify(item, child_level, memo))
+                return "[\n" + ",\n".join(parts) + "\n" + indent + "]"
 
-            items: list[str] = []
-            for item in data:
-                if item == _TRUNCATION_TOKEN:
-                    items.append(f"{indent}{indent_str}...")
-                else:
-                    items.append(
-                        f"{indent}{indent_str}"
-                        f"{self._custom_stringify(item, indent_level + 1).strip()}"
-                    )
-            inner = ",\n".join(items)
-            return f"[\n{inner}\n{indent}]"
-
-        if isinstance(data, dict):
-            keys = list(data.keys())
-            if len(keys) == 0:
-                return "{}"
-            if len(keys) == 1 and keys[0] == _TRUNCATION_TOKEN:
-                return "{...}"
-
-            props: list[str] = []
-            for key in keys:
+            for key, val in data.items():
                 if key == _TRUNCATION_TOKEN:
-                    props.append(f"{indent}{indent_str}...")
+                    append(child_indent + "...")
+                elif val == _TRUNCATION_TOKEN:
+                    append(f'{child_indent}"{key}": ...')
                 else:
-                    val = data[key]
-                    if val == _TRUNCATION_TOKEN:
-                        val_str = "..."
-                    else:
-                        val_str = self._custom_stringify(
-                            val, indent_level + 1
-                        ).strip()
-                    props.append(f'{indent}{indent_str}"{key}": {val_str}')
-            inner = ",\n".join(props)
-            return f"{{\n{inner}\n{indent}}}"
+                    append(f'{child_indent}"{key}": {stringify(val, child_level, memo)}')
+            return "{\n" + ",\n".join(parts) + "\n" + indent + "}"
 
         # Primitives – use json.dumps for proper escaping
         return json.dumps(data, ensure_ascii=False)
@@ -119,8 +144,35 @@ class Truncator:
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _get_size(self, obj: Any) -> int:
-        return len(self._custom_stringify(obj))
+    def _cap_depth(self, obj: Any, depth: int) -> Any:
+        """Replace containers at or below ``max_depth`` with a placeholder.
+
+        Untouched subtrees are returned as-is; only the containers on the
+        way down to a capped child are rebuilt.
+        """
+        is_dict = isinstance(obj, dict)
+        if not is_dict and not isinstance(obj, list):
+            return obj
+        if depth >= self._cfg.max_depth:
+            return _MAX_DEPTH_TOKEN
+
+        child_depth = depth + 1
+        if is_dict:
+            capped_items = {k: self._cap_depth(v, child_depth) for k, v in obj.items()}
+            if all(capped_items[k] is v for k, v in obj.items()):
+                return obj
+            return capped_items
+        capped_list = [self._cap_depth(v, child_depth) for v in obj]
+        if all(c is v for c, v in zip(capped_list, obj)):
+            return obj
+        return capped_list
+
+    def _get_size(
+        self,
+        obj: Any,
+        memo: dict[tuple[int, int], tuple[Any, str]] | None = None,
+    ) -> int:
+        return len(self._custom_stringify(obj, 0, memo))
 
     @staticmethod
     def _set_in(obj: Any, path: list[str | int], value: Any) -> Any:
@@ -328,85 +380,83 @@ class Truncator:
     # ------------------------------------------------------------------
 
     def _smart_truncate(self, data: Any, limit: int) -> Any:
-        if self._get_size(data) <= limit:
+        """Shrink *data* round by round until it fits in *limit* chars.
+
+        Data that already fits is returned unchanged. Otherwise containers
+        nested beyond ``max_depth`` are replaced first, then each round
+        applies the first strategy that makes progress (strings, then
+        arrays, then objects). Array and object collapses remove one item
+        per round, so the rounds run in a loop rather than recursing: a
+        long array would otherwise need one stack frame per item.
+        """
+        memo: dict[tuple[int, int], tuple[Any, str]] = {}
+        if self._get_size(data, memo) <= limit:
             return data
+        if self._cfg.max_depth is not None:
+            data = self._cap_depth(data, 0)
+        while self._get_size(data, memo) > limit:
+            nodes = self._collect_nodes(data)
 
-        nodes = self._collect_nodes(data)
-
-        # --- Strategy 1: truncate strings ---
-        string_candidates = [
-            n
-            for n in nodes
-            if n.type == "string"
-            and n.length > self._cfg.min_len_for_truncation
-            and n.value != _TRUNCATION_TOKEN
-        ]
-
-        if string_candidates:
-
-            def _get_updates(max_len: int) -> list[dict[str, Any]]:
-                return [
-                    {
-                        "path": n.path,
-                        "value": n.value[
-                            : max(0, max_len - self._cfg.ellipsis_size)
-                        ]
-                        + "...",
-                    }
-                    for n in string_candidates
-                    if n.length > max_len
-                ]
-
-            def _apply_updates(
-                upds: list[dict[str, Any]], current: Any
-            ) -> Any:
-                result = current
-                for u in upds:
-                    result = self._set_in(result, u["path"], u["value"])
-                return result
-
-            base_len = self._cfg.min_len_for_truncation
-            base_updates = _get_updates(base_len)
-            base_data = _apply_updates(base_updates, data)
-
-            if self._get_size(base_data) > limit:
-                return self._smart_truncate(base_data, limit)
-            else:
-                low = base_len
-                high = max(n.length for n in string_candidates)
-                best_data = base_data
-
-                while low <= high:
-                    mid = (low + high) // 2
-                    updates = _get_updates(mid)
-                    attempt_data = _apply_updates(updates, data)
-
-                    if self._get_size(attempt_data) <= limit:
-                        best_data = attempt_data
-                        low = mid + 1
-                    else:
-                        high = mid - 1
+            # --- Strategy 1: truncate strings ---
+            string_candidates = [
+                n
+                for n in nodes
+                if n.type == "string"
+                and n.length > self._cfg.min_len_for_truncation
+                and n.value != _TRUNCATION_TOKEN
+            ]
+
+            if string_candidates:
+                base_len = self._cfg.min_len_for_truncation
+                base_data = self._truncate_strings(data, string_candidates, base_len)
+
+                if self._get_size(base_data, memo) > limit:
+                    data = base_data
+                    continue
+                return self._fit_strings(
+                    data, string_candidates, base_data, limit, memo
+                )
 
-                return best_data
+            # --- Strategy 2: collapse arrays ---
+            # --- Strategy 3: collapse objects ---
+            updates = self._apply_array_strategy(nodes) or self._apply_object_strategy(nodes)
+            if not updates:
+                break
+            for update in updates:
+                data = self._set_in(data, update["path"], update["value"])
 
-        # --- Strategy 2: collapse arrays ---
-        array_updates = self._apply_array_strategy(nodes)
-        if array_updates:
-            next_data = data
-            for update in array_updates:
-                next_data = self._set_in(
-                    next_data, update["path"], update["value"]
-                )
-            return self._smart_truncate(next_data, limit)
-
-        # --- Strategy 3: collapse objects ---
-        object_updates = self._apply_object_strategy(nodes)
-        if object_updates:
-            next_data = data
-            for update in object_updates:
-                next_data = self._set_in(
-                    next_data, update["path"], update["value"]
-                )
-            return self._smart_truncate(next_data, limit)
+        return data
 
+    def _truncate_strings(
+        self, data: Any, candidates: list[_Node], max_len: int
+    ) -> Any:
+        """Cut every candidate string longer than *max_len* down to it."""
+        keep = max(0, max_len - self._cfg.ellipsis_size)
+        for n in candidates:
+            if n.length > max_len:
+                data = self._set_in(data, n.path, n.value[:keep] + "...")
         return data
+
+    def _fit_strings(
+        self,
+        data: Any,
+        candidates: list[_Node],
+        best_data: Any,
+        limit: int,
+        memo: dict[tuple[int, int], tuple[Any, str]],
+    ) -> Any:
+        """Binary-search the longest string cut-off that still fits *limit*."""
+        low = self._cfg.min_len_for_truncation
+        high = max(n.length for n in candidates)
+
+        while low <= high:
+            mid = (low + high) // 2
+            attempt_data = self._truncate_strings(data, candidates, mid)
+
+            if self._get_size(attempt_data, memo) <= limit:
+                best_data = attempt_data
+                low = mid + 1
+            else:
+                high = mid - 1
+
+        return best_data
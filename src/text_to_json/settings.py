@@ -33,6 +33,7 @@ class Settings(BaseSettings):
     TRUNCATE_ELLIPSIS_SIZE: int = 3
     TRUNCATE_MIN_ARRAY_ITEMS: int = 2
     TRUNCATE_MIN_OBJECT_KEYS: int = 2
+    TRUNCATE_MAX_DEPTH: int | None = 6
 
 
 @lru_cache(maxsize=1)
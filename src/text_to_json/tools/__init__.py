@@ -1,3 +1,8 @@
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from text_to_json.tools.json_pointer import (
     decode_pointer_token,
     encode_pointer_token,
@@ -9,7 +14,18 @@ from text_to_json.tools.read_value import read_value
 from text_to_json.tools.search_pointer import search_pointer
 from text_to_json.tools.apply_patches import apply_patches
 from text_to_json.tools.update_guidance import update_guidance
-from text_to_json.tools.definitions import ALL_TOOLS
+
+if TYPE_CHECKING:
+    from text_to_json.tools.definitions import ALL_TOOLS
+
+# Names resolved on first attribute access (PEP 562). Only the LangChain tool
+# definitions are deferred: they pull in langchain_core and pydantic, while
+# the tool functions above are stdlib-only. The functions cannot be deferred
+# anyway, because each shares its name with its submodule and importing the
+# submodule would bind the module object on the package instead.
+_LAZY: dict[str, str] = {
+    "ALL_TOOLS": "text_to_json.tools.definitions",
+}
 
 __all__ = [
     "decode_pointer_token",
@@ -23,3 +39,16 @@ __all__ = [
     "update_guidance",
     "ALL_TOOLS",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import copy
+import ipaddress
 import json
-import math
 import re
-from datetime import datetime
-from typing import Any, Optional
+import string
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, ClassVar, Optional
 from urllib.parse import urlparse
 
 from text_to_json.tools.json_pointer import (
@@ -13,80 +15,504 @@ from text_to_json.tools.json_pointer import (
     parse_json_pointer,
 )
 
+# ── String format validators ─────────────────────────────────────────
+# Patterns are compiled once at import; the validators below are looked up
+# by format name in _FORMAT_VALIDATORS instead of walking an if-chain.
+# Formats without an entry are accepted.
+_EMAIL_RE = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
+_TIME_RE = re.compile(r"^(\d{2}):(\d{2}):(\d{2})(\.\d+)?(Z|[+-]\d{2}:\d{2})?$")
+_DURATION_RE = re.compile(
+    r"^P(?:(\d+)Y)?(?:(\d+)M)?(?:(\d+)D)?"
+    r"(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?$"
+    r"|^P(\d+)W$"
+)
+_URI_REFERENCE_RE = re.compile(r"^[^:/?#]*(?:/[^?#]*)?(?:\?[^#]*)?(?:#.*)?$")
+_URI_TEMPLATE_NESTED_RE = re.compile(r"\{[^}]*\{|\}[^{]*\}")
+_URI_TEMPLATE_VAR_RE = re.compile(
+    r"\{[+#./;?&]?[a-zA-Z0-9_]+"
+    r"(?::[1-9][0-9]*|\*)?"
+    r"(?:,[a-zA-Z0-9_]+(?::[1-9][0-9]*|\*)?)*\}"
+)
+_BRACE_RE = re.compile(r"[{}]")
+_BAD_POINTER_ESCAPE_RE = re.compile(r"~(?![01])")
+_RELATIVE_JSON_POINTER_RE = re.compile(r"^(0|[1-9][0-9]*)(#|/.*)?\Z")
+_ASCII_DIGITS = frozenset(string.digits)
+_HOSTNAME_CHARS = frozenset(string.ascii_letters + string.digits + "-.")
+_HEX_DIGITS = frozenset(string.hexdigits)
+_UUID_DASHES = (8, 13, 18, 23)
+
+
+def _is_digits(value: str) -> bool:
+    return value.isascii() and value.isdigit()
+
+
+def _has_date_layout(value: str) -> bool:
+    """``YYYY-MM-DD`` layout check on the first 10 characters of *value*."""
+    return (
+        value[4] == "-"
+        and value[7] == "-"
+        and _is_digits(value[:4])
+        and _is_digits(value[5:7])
+        and _is_digits(value[8:10])
+    )
+
+
+def _is_date(value: str) -> bool:
+    if len(value) != 10 or not _has_date_layout(value):
+        return False
+    # The layout check keeps out the other ISO 8601 shapes fromisoformat
+    # accepts on 3.11+ (``20240115``, ``2024-W03-1``); the C parser then
+    # rejects month/day out of range, impossible dates and year 0.
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_date_time(value: str) -> bool:
+    """RFC 3339 ``date-time``: ``YYYY-MM-DDTHH:MM:SS[.frac](Z|±HH:MM)``."""
+    n = len(value)
+    if n < 20 or not _has_date_layout(value) or value[10] not in "Tt":
+        return False
+    if (
+        value[13] != ":"
+        or value[16] != ":"
+        or not _is_digits(value[11:13])
+        or not _is_digits(value[14:16])
+        or not _is_digits(value[17:19])
+    ):
+        return False
+    pos = 19
+    if value[pos] == ".":
+        end = pos + 1
+        while end < n and value[end] in _ASCII_DIGITS:
+            end += 1
+        if end == pos + 1:
+            return False
+        pos = end
+    tz = value[pos:]
+    if tz != "Z" and tz != "z":
+        if (
+            len(tz) != 6
+            or tz[0] not in "+-"
+            or tz[3] != ":"
+            or not _is_digits(tz[1:3])
+            or not _is_digits(tz[4:6])
+        ):
+            return False
+    # Field ranges and calendar validity are checked by the C parser.
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00").replace("z", "+00:00"))
+    except (ValueError, OverflowError):
+        return False
+    return True
+
+
+def _is_uri(value: str) -> bool:
+    try:
+        parsed = urlparse(value)
+        return bool(parsed.scheme) and len(parsed.scheme) >= 1
+    except Exception:
+        return False
+
+
+def _is_ipv4(value: str) -> bool:
+    # ipaddress rejects leading zeros and out-of-range octets itself.
+    try:
+        ipaddress.IPv4Address(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_ipv6(value: str) -> bool:
+    """RFC 4291 address; zone ids (``%eth0``) are not part of the format."""
+    if "%" in value:
+        return False
+    try:
+        ipaddress.IPv6Address(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_uuid(value: str) -> bool:
+    """Check the 8-4-4-4-12 hex layout with an RFC 4122 version and variant."""
+    if len(value) != 36:
+        return False
+    for i in _UUID_DASHES:
+        if value[i] != "-":
+            return False
+    if value[14] not in "12345" or value[19] not in "89abAB":
+        return False
+    # Only the four layout dashes may be dashes; every other char is hex.
+    return all(_HEX_DIGITS.issuperset(part) for part in value.split("-", 4))
+
+
+def _is_time(value: str) -> bool:
+    m = _TIME_RE.match(value)
+    if not m:
+        return False
+    h, mn, sec = int(m.group(1)), int(m.group(2)), int(m.group(3))
+    return 0 <= h <= 23 and 0 <= mn <= 59 and 0 <= sec <= 60
+
+
+def _is_duration(value: str) -> bool:
+    return value not in ("P", "PT") and _DURATION_RE.match(value) is not None
+
+
+def _is_relative_ref_start(value: str) -> bool:
+    return value == "" or value[0] in "/#?"
+
+
+def _is_uri_reference(value: str) -> bool:
+    if _is_relative_ref_start(value):
+        return True
+    try:
+        urlparse(value)
+        return True
+    except Exception:
+        return bool(_URI_REFERENCE_RE.match(value))
+
+
+def _is_uri_template(value: str) -> bool:
+    if _URI_TEMPLATE_NESTED_RE.search(value):
+        return False
+    without_templates = _URI_TEMPLATE_VAR_RE.sub("", value)
+    return not _BRACE_RE.search(without_templates)
+
+
+def _is_iri_reference(value: str) -> bool:
+    return _is_relative_ref_start(value) or _is_uri(value)
+
+
+def _is_hostname(value: str) -> bool:
+    # One charset scan for the whole name; labels then only need their
+    # length and hyphen placement checked.
+    if len(value) > 253 or not _HOSTNAME_CHARS.issuperset(value):
+        return False
+    for label in value.split("."):
+        if not label or len(label) > 63 or label[0] == "-" or label[-1] == "-":
+            return False
+    return True
+
+
+def _is_idn_hostname(value: str) -> bool:
+    if len(value) > 253:
+        return False
+    for label in value.split("."):
+        if len(label) == 0 or len(label) > 63:
+            return False
+        if label.startswith("-") or label.endswith("-"):
+            return False
+    return True
+
+
+def _is_json_pointer(value: str) -> bool:
+    if value == "":
+        return True
+    if not value.startswith("/"):
+        return False
+    return not _BAD_POINTER_ESCAPE_RE.search(value)
+
+
+def _is_relative_json_pointer(value: str) -> bool:
+    m = _RELATIVE_JSON_POINTER_RE.match(value)
+    if not m:
+        return False
+    suffix = m.group(2) or ""
+    if suffix and suffix != "#" and suffix.startswith("/"):
+        return not _BAD_POINTER_ESCAPE_RE.search(suffix)
+    return True
+
+
+@lru_cache(maxsize=1024)
+def _is_regex(value: str) -> bool:
+    try:
+        re.compile(value)
+        return True
+    except re.error:
+        return False
+
+
+_FORMAT_VALIDATORS: dict[str, Callable[[str], Any]] = {
+    "email": _EMAIL_RE.match,
+    "idn-email": _EMAIL_RE.match,
+    "date": _is_date,
+    "date-time": _is_date_time,
+    "time": _is_time,
+    "duration": _is_duration,
+    "uri": _is_uri,
+    "uri-reference": _is_uri_reference,
+    "uri-template": _is_uri_template,
+    "iri": _is_uri,
+    "iri-reference": _is_iri_reference,
+    "hostname": _is_hostname,
+    "idn-hostname": _is_idn_hostname,
+    "ipv4": _is_ipv4,
+    "ipv6": _is_ipv6,
+    "uuid": _is_uuid,
+    "json-pointer": _is_json_pointer,
+    "relative-json-pointer": _is_relative_json_pointer,
+    "regex": _is_regex,
+}
+
+
+# ── "pattern" keyword ────────────────────────────────────────────────
+_REGEX_METACHARS = frozenset(".^$*+?{}[]\\|()")
+
+
+def _always_true(value: str) -> bool:
+    return True
+
+
+def _has_non_newline(value: str) -> bool:
+    return bool(value.replace("\n", ""))
+
+
+def _starts_with_non_newline(value: str) -> bool:
+    return value[:1] not in ("", "\n")
+
+
+@lru_cache(maxsize=1024)
+def _pattern_matcher(pattern: str) -> Callable[[str], Any]:
+    """Return a predicate equivalent to ``re.search(pattern, value)``.
+
+    Patterns that are common in real schemas are answered without the
+    regex engine: ``.*`` always matches, ``.+`` needs a non-newline
+    character (at the start for ``^.+``), and a plain literal (optionally anchored with ``^``) is a
+    substring or prefix test. Anything else is compiled once. Invalid
+    patterns raise ``re.error`` just like ``re.search`` would.
+    """
+    if pattern in ("", ".*", "^.*", "^"):
+        return _always_true
+    if pattern == ".+":
+        return _has_non_newline
+    if pattern == "^.+":
+        return _starts_with_non_newline
+    body = pattern[1:] if pattern[0] == "^" else pattern
+    if not _REGEX_METACHARS.intersection(body):
+        if body is pattern:
+            return lambda value: body in value
+        return lambda value: value.startswith(body)
+    return re.compile(pattern).search
+
+
+# ── Validation helpers ───────────────────────────────────────────────
+class _Invalid(Exception):
+    """Raised by ``_validate_node`` in fail-fast mode on the first error."""
+
+
+# Stack-frame marker in ``_validate_node``: the frame's instance slot holds
+# an error message to record at the frame's location.
+_DEFERRED_ERROR = object()
+
+# Task marker in ``_inline_refs``: a ``$ref`` expansion has finished.
+_REF_DONE = object()
+
+# Stack-frame marker in ``_validate_node``: every frame of a memoized
+# subtree has run, so its errors can be recorded.
+_MEMO_END = object()
+
+# id(container) -> (container, {id(schema): (schema, relative errors)}).
+# Entries hold their container and schema so neither id can be reused
+# while the entry exists.
+_ValidationMemo = dict[
+    int, tuple[Any, dict[int, tuple[Any, tuple[tuple[str, str], ...]]]]
+]
+
+
+def _pointer_from(base: str, path: list[str]) -> str:
+    """Error pointer for the node at *base* followed by the tokens in *path*."""
+    if path:
+        return base + "/" + "/".join(path)
+    return base or "/"
+
+
+# JSON type name by exact Python type. bool must be looked up by type, not
+# isinstance, since it subclasses int. float is absent on purpose: its name
+# depends on the value.
+_JSON_TYPE_NAMES: dict[type, str] = {
+    type(None): "null",
+    bool: "boolean",
+    int: "integer",
+    str: "string",
+    list: "array",
+    dict: "object",
+}
+
+# Hint appended to a rejected add/replace, by (schema type, value type).
+# Value types other than object and array are looked up as "".
+_TYPE_MISMATCH_HINTS: dict[tuple[str, str], str] = {
+    ("array", "object"): (
+        ' HINT: The schema expects an array at "%(path)s", '
+        "but you provided a single object. "
+        'To append this object to the array, use path "%(path)s/-" instead.'
+    ),
+    ("array", ""): (
+        ' HINT: The schema expects an array at "%(path)s". '
+        'To append an item, use path "%(path)s/-" with the item as value.'
+    ),
+    ("object", "array"): (
+        ' HINT: The schema expects an object at "%(path)s", '
+        "but you provided an array. Pass a single object as the value."
+    ),
+}
+
+
+# ── Cloning ──────────────────────────────────────────────────────────
+_IMMUTABLE_SCALARS = (str, int, float, bool, type(None))
+
+
+def _json_clone(obj: Any) -> Any:
+    """Deep-copy a JSON tree.
+
+    dicts and lists (including subclasses) are rebuilt as plain dicts and
+    lists and immutable scalars are shared, which is much cheaper than
+    ``copy.deepcopy``'s memo and protocol lookups. Any other value falls
+    back to ``copy.deepcopy``.
+    """
+    t = type(obj)
+    if t is dict:
+        return {k: _json_clone(v) for k, v in obj.items()}
+    if t is list:
+        return [_json_clone(v) for v in obj]
+    if t in _IMMUTABLE_SCALARS:
+        return obj
+    # Subclasses become plain containers, so code walking a cloned
+    # document can test ``type(x) is dict`` / ``type(x) is list``.
+    if isinstance(obj, dict):
+        return {k: _json_clone(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_json_clone(v) for v in obj]
+    return copy.deepcopy(obj)
+
+
+# ── Container mutation ───────────────────────────────────────────────
+# Used by ``SchemaPatchChecker._apply_op``. Each mutates *parent* in place;
+# a ``None`` parent (the root pointer, or a missing container) is handled
+# by the caller, which rebinds the document instead.
+def _add_in(parent: Any, key: str, value: Any) -> None:
+    if type(parent) is list:
+        idx = len(parent) if key == "-" else int(key)
+        if idx < 0 or idx > len(parent):
+            raise ValueError(f"add in array: invalid index: {key}")
+        parent.insert(idx, value)
+        return
+    if type(parent) is not dict:
+        raise ValueError("add: parent is not object/array at path")
+    parent[key] = value
+
+
+def _set_in(parent: Any, key: str, value: Any, op_path: str) -> None:
+    if type(parent) is list:
+        idx = int(key)
+        if idx < 0 or idx >= len(parent):
+            raise ValueError(f"replace failed: {op_path} does not exist")
+        parent[idx] = value
+        return
+    if type(parent) is not dict:
+        raise ValueError("replace: parent is not object/array at path")
+    if key not in parent:
+        raise ValueError(f"replace failed: {op_path} does not exist")
+    parent[key] = value
+
+
+def _remove_in(parent: Any, key: str, op_path: str) -> None:
+    if type(parent) is list:
+        idx = int(key)
+        if idx < 0 or idx >= len(parent):
+            raise ValueError(f"remove failed: {op_path} does not exist")
+        parent.pop(idx)
+        return
+    if type(parent) is not dict:
+        raise ValueError("remove: parent is not object/array at path")
+    if key not in parent:
+        raise ValueError(f"remove failed: {op_path} does not exist")
+    del parent[key]
+
 
 class SchemaPatchChecker:
     _ANY_SCHEMA: dict[str, Any] = {"__any": True}
 
-    @staticmethod
-    def _is_object(x: Any) -> bool:
-        return isinstance(x, dict)
+    # Prepared (ref-inlined) schemas keyed by id() of the caller's schema.
+    # Each entry keeps the original schema alive so its id cannot be reused
+    # by another object while the entry is cached.
+    _PREPARED_CACHE: ClassVar[dict[int, tuple[Any, Any, dict[str, Any]]]] = {}
+    _PREPARED_CACHE_MAX: int = 32
+
+    # Sub-schema candidates keyed by (id(schema), property name), with None
+    # standing for "array item". Entries keep the schema alive for the same
+    # reason as above; the cached lists are shared and must not be mutated.
+    _CANDIDATE_CACHE: ClassVar[
+        dict[tuple[int, Optional[str]], tuple[Any, list[Any]]]
+    ] = {}
+    _CANDIDATE_CACHE_MAX: int = 4096
 
     @staticmethod
-    def _clone(obj: Any) -> Any:
-        return copy.deepcopy(obj)
+    def _deep_equal(a: Any, b: Any) -> bool:
+        # For JSON values the built-in comparison already has the semantics
+        # we want (ints and floats compare by value, containers compare
+        # structurally) and walks nested lists/dicts in C. The identity check
+        # keeps a NaN equal to itself, as list/dict comparison does.
+        return a is b or a == b
 
-    @classmethod
-    def _deep_equal(cls, a: Any, b: Any) -> bool:
-        if a is b:
-            return True
-        if type(a) is not type(b):
-            # special: int/float comparison
-            if isinstance(a, (int, float)) and isinstance(b, (int, float)):
-                return a == b
+    @staticmethod
+    def _enum_contains(values: list[Any], instance: Any) -> bool:
+        # A malformed, non-list enum (e.g. a string) accepts nothing; "in"
+        # on it would test substrings or keys, or raise.
+        if not isinstance(values, list):
             return False
-        if a is None:
-            return b is None
-        if isinstance(a, list) and isinstance(b, list):
-            if len(a) != len(b):
-                return False
-            return all(cls._deep_equal(a[i], b[i]) for i in range(len(a)))
-        if isinstance(a, dict) and isinstance(b, dict):
-            ak = set(a.keys())
-            bk = set(b.keys())
-            if ak != bk:
-                return False
-            return all(cls._deep_equal(a[k], b[k]) for k in ak)
-        return a == b
+        return instance in values
 
     _decode_pointer_token = staticmethod(decode_pointer_token)
-    _parse_json_pointer = staticmethod(parse_json_pointer)
+    # Parsed pointers are memoized: each op path is parsed by the validator
+    # and again when the op is applied, and batches often repeat paths.
+    # The returned token lists are shared and must be treated as read-only.
+    _parse_json_pointer = staticmethod(lru_cache(maxsize=4096)(parse_json_pointer))
 
     @classmethod
-    def _get_at(cls, doc: Any, tokens: list[str]) -> dict[str, Any]:
+    def _walk(
+        cls, doc: Any, tokens: list[str]
+    ) -> tuple[Any, Optional[str], bool, Any]:
+        """Resolve *tokens* in one pass.
+
+        Returns ``(parent, key, exists, value)``: the container holding the
+        last token (``None`` when that container does not exist), the last
+        token, and whether/what the full pointer resolves to. The root
+        pointer has no parent or key.
+        """
+        if not tokens:
+            return None, None, True, doc
+        last = len(tokens) - 1
         cur = doc
-        for t in tokens:
+        for i, t in enumerate(tokens):
+            if i == last:
+                parent = cur
             if cur is None:
-                return {"exists": False, "value": None}
-            if isinstance(cur, list):
+                break
+            if type(cur) is list:
                 if t == "-":
-                    return {"exists": False, "value": None}
+                    break
                 try:
                     idx = int(t)
                 except (ValueError, TypeError):
-                    return {"exists": False, "value": None}
+                    break
                 if idx < 0 or idx >= len(cur):
-                    return {"exists": False, "value": None}
+                    break
                 cur = cur[idx]
-            elif cls._is_object(cur):
+            elif type(cur) is dict:
                 if t not in cur:
-                    return {"exists": False, "value": None}
+                    break
                 cur = cur[t]
             else:
-                return {"exists": False, "value": None}
-        return {"exists": True, "value": cur}
-
-    @classmethod
-    def _get_parent_and_key(
-        cls, doc: Any, tokens: list[str]
-    ) -> dict[str, Any]:
-        if len(tokens) == 0:
-            return {"parent": None, "key": None}
-        key = tokens[-1]
-        parent_tokens = tokens[:-1]
-        res = cls._get_at(doc, parent_tokens)
-        if not res["exists"]:
-            return {"parent": None, "key": key}
-        return {"parent": res["value"], "key": key}
+                break
+        else:
+            return parent, tokens[-1], True, cur
+        if i == last:
+            return parent, tokens[-1], False, None
+        return None, tokens[-1], False, None
 
     @staticmethod
     def _resolve_ref(schema: Any, root_schema: Any) -> Any:
@@ -121,51 +547,79 @@ class SchemaPatchChecker:
         return current
 
     @classmethod
-    def _inline_refs(cls, schema: Any, root_schema: Any, _seen: Optional[set] = None) -> Any:
-        """Recursively resolve all $ref in a schema, inlining definitions.
+    def _inline_refs(cls, schema: Any, root_schema: Any) -> Any:
+        """Resolve all $ref in a schema, inlining definitions.
 
         Handles circular references by stopping after the first encounter.
+        Each ``$ref`` whose expansion reached no circular reference is
+        inlined once and the result shared by every later occurrence
+        (``ref_cache``); such an expansion does not depend on where the
+        ref appears. ``cycles`` counts the circular stops so that
+        expansions that did hit one are left out of the cache.
+
+        The walk uses an explicit stack, so deeply nested schemas cannot
+        hit the interpreter's recursion limit. Each visit task writes its
+        result into ``container[key]``; new dicts are created with their
+        keys in source order and filled in as their children are visited.
         """
-        if _seen is None:
-            _seen = set()
-        if not isinstance(schema, dict):
-            return schema
+        ref_cache: dict[str, Any] = {}
+        cycles = 0
+        out: list[Any] = [None]
+        stack: list[tuple[Any, ...]] = [(schema, frozenset(), out, 0)]
+        while stack:
+            task = stack.pop()
+            if task[0] is _REF_DONE:
+                # Every task of the ref's expansion has run by now.
+                _, ref, cycles_before, container, key = task
+                if cycles == cycles_before:
+                    ref_cache[ref] = container[key]
+                continue
 
-        # Resolve $ref first
-        if "$ref" in schema:
-            ref = schema["$ref"]
-            if ref in _seen:
-                # Circular ref — return a permissive schema to avoid infinite loop
-                return cls._ANY_SCHEMA
-            resolved = cls._resolve_ref(schema, root_schema)
-            if resolved is schema:
-                return schema  # couldn't resolve
-            new_seen = _seen | {ref}
-            return cls._inline_refs(resolved, root_schema, new_seen)
-
-        # Recurse into known schema keywords
-        result = {}
-        for key, val in schema.items():
-            if key == "properties" and isinstance(val, dict):
-                result[key] = {
-                    k: cls._inline_refs(v, root_schema, _seen)
-                    for k, v in val.items()
-                }
-            elif key == "items" and isinstance(val, dict):
-                result[key] = cls._inline_refs(val, root_schema, _seen)
-            elif key == "additionalProperties" and isinstance(val, dict):
-                result[key] = cls._inline_refs(val, root_schema, _seen)
-            elif key in ("anyOf", "oneOf", "allOf") and isinstance(val, list):
-                result[key] = [
-                    cls._inline_refs(item, root_schema, _seen)
-                    for item in val
-                ]
-            elif key == "definitions" and isinstance(val, dict):
-                # Don't recurse into definitions (they get resolved via $ref)
-                result[key] = val
-            else:
-                result[key] = val
-        return result
+            node, seen, container, key = task
+            if not isinstance(node, dict):
+                container[key] = node
+                continue
+
+            # Resolve $ref first
+            if "$ref" in node:
+                ref = node["$ref"]
+                if ref in seen:
+                    # Circular ref — return a permissive schema to avoid infinite loop
+                    cycles += 1
+                    container[key] = cls._ANY_SCHEMA
+                    continue
+                cached = ref_cache.get(ref)
+                if cached is not None:
+                    container[key] = cached
+                    continue
+                resolved = cls._resolve_ref(node, root_schema)
+                if resolved is node:
+                    container[key] = node  # couldn't resolve
+                    continue
+                stack.append((_REF_DONE, ref, cycles, container, key))
+                stack.append((resolved, seen | {ref}, container, key))
+                continue
+
+            # Descend into known schema keywords
+            result: dict[str, Any] = {}
+            children: list[tuple[Any, ...]] = []
+            for k, val in node.items():
+                if k == "properties" and isinstance(val, dict):
+                    sub = result[k] = dict.fromkeys(val)
+                    children.extend((v, seen, sub, name) for name, v in val.items())
+                elif k in ("items", "additionalProperties") and isinstance(val, dict):
+                    result[k] = None
+                    children.append((val, seen, result, k))
+                elif k in ("anyOf", "oneOf", "allOf") and isinstance(val, list):
+                    sub = result[k] = [None] * len(val)
+                    children.extend((v, seen, sub, i) for i, v in enumerate(val))
+                else:
+                    # Includes "definitions", which are reached via $ref
+                    result[k] = val
+            container[key] = result
+            children.reverse()
+            stack.extend(children)
+        return out[0]
 
     @staticmethod
     def _normalize_type(type_val: Any) -> Optional[list[str]]:
@@ -177,8 +631,13 @@ class SchemaPatchChecker:
 
     @staticmethod
     def _type_of_instance(x: Any) -> str:
-        if x is None:
-            return "null"
+        t = _JSON_TYPE_NAMES.get(type(x))
+        if t is not None:
+            return t
+        if isinstance(x, float):
+            # A float with no fractional part is also an integer
+            return "integer" if x.is_integer() else "number"
+        # Subclasses of the JSON types (OrderedDict, IntEnum, ...)
         if isinstance(x, bool):
             return "boolean"
         if isinstance(x, list):
@@ -187,11 +646,6 @@ class SchemaPatchChecker:
             return "object"
         if isinstance(x, int):
             return "integer"
-        if isinstance(x, float):
-            # A float with no fractional part is also an integer
-            if x == int(x) and not (math.isinf(x) or math.isnan(x)):
-                return "integer"
-            return "number"
         if isinstance(x, str):
             return "string"
         return type(x).__name__
@@ -201,210 +655,11 @@ class SchemaPatchChecker:
         if not isinstance(value, str):
             return False
 
-        if fmt == "email":
-            return bool(re.match(r"^[^\s@]+@[^\s@]+\.[^\s@]+$", value))
-
-        if fmt == "idn-email":
-            return bool(re.match(r"^[^\s@]+@[^\s@]+\.[^\s@]+$", value))
-
-        if fmt == "date":
-            m = re.match(r"^(\d{4})-(\d{2})-(\d{2})$", value)
-            if not m:
-                return False
-            y, mo, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
-            if mo < 1 or mo > 12:
-                return False
-            if d < 1 or d > 31:
-                return False
-            try:
-                dt = datetime(y, mo, d)
-                return dt.month == mo and dt.day == d and y >= 0
-            except (ValueError, OverflowError):
-                return False
-
-        if fmt == "time":
-            m = re.match(
-                r"^(\d{2}):(\d{2}):(\d{2})(\.\d+)?(Z|[+-]\d{2}:\d{2})?$",
-                value,
-            )
-            if not m:
-                return False
-            h, mn, sec = int(m.group(1)), int(m.group(2)), int(m.group(3))
-            return 0 <= h <= 23 and 0 <= mn <= 59 and 0 <= sec <= 60
-
-        if fmt == "date-time":
-            m = re.match(
-                r"^(\d{4})-(\d{2})-(\d{2})[Tt](\d{2}):(\d{2}):(\d{2})"
-                r"(\.\d+)?([Zz]|[+-]\d{2}:\d{2})$",
-                value,
-            )
-            if not m:
-                return False
-            y = int(m.group(1))
-            mo = int(m.group(2))
-            d = int(m.group(3))
-            h = int(m.group(4))
-            mn = int(m.group(5))
-            sec = int(m.group(6))
-            if mo < 1 or mo > 12:
-                return False
-            if d < 1 or d > 31:
-                return False
-            if h < 0 or h > 23:
-                return False
-            if mn < 0 or mn > 59:
-                return False
-            if sec < 0 or sec > 60:
-                return False
-            try:
-                datetime.fromisoformat(value.replace("Z", "+00:00").replace("z", "+00:00"))
-            except (ValueError, OverflowError):
-                return False
-            return y >= 0
-
-        if fmt == "duration":
-            m = re.match(
-                r"^P(?:(\d+)Y)?(?:(\d+)M)?(?:(\d+)D)?"
-                r"(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?$"
-                r"|^P(\d+)W$",
-                value,
-            )
-            if not m:
-                return False
-            if value in ("P", "PT"):
-                return False
-            return True
-
-        if fmt == "uri":
-            try:
-                parsed = urlparse(value)
-                return bool(parsed.scheme) and len(parsed.scheme) >= 1
-            except Exception:
-                return False
-
-        if fmt == "uri-reference":
-            if value == "" or value.startswith("/") or value.startswith("#") or value.startswith("?"):
-                return True
-            try:
-                urlparse(value)
-                return True
-            except Exception:
-                return bool(
-                    re.match(r"^[^:/?#]*(?:/[^?#]*)?(?:\?[^#]*)?(?:#.*)?$", value)
-                )
-
-        if fmt == "uri-template":
-            if re.search(r"\{[^}]*\{|\}[^{]*\}", value):
-                return False
-            template_var_re = (
-                r"\{[+#./;?&]?[a-zA-Z0-9_]+"
-                r"(?::[1-9][0-9]*|\*)?"
-                r"(?:,[a-zA-Z0-9_]+(?::[1-9][0-9]*|\*)?)*\}"
-            )
-            without_templates = re.sub(template_var_re, "", value)
-            return not re.search(r"[{}]", without_templates)
-
-        if fmt in ("iri", "iri-reference"):
-            if fmt == "iri-reference":
-                if value == "" or value.startswith("/") or value.startswith("#") or value.startswith("?"):
-                    return True
-            try:
-                parsed = urlparse(value)
-                return bool(parsed.scheme) and len(parsed.scheme) >= 1
-            except Exception:
-                return False
-
-        if fmt == "hostname":
-            if len(value) > 253:
-                return False
-            labels = value.split(".")
-            for label in labels:
-                if len(label) == 0 or len(label) > 63:
-                    return False
-                if not re.match(r"^[a-zA-Z0-9]([a-zA-Z0-9-]*[a-zA-Z0-9])?$", label) and not re.match(
-                    r"^[a-zA-Z0-9]$", label
-                ):
-                    return False
-            return True
-
-        if fmt == "idn-hostname":
-            if len(value) > 253:
-                return False
-            labels = value.split(".")
-            for label in labels:
-                if len(label) == 0 or len(label) > 63:
-                    return False
-                if label.startswith("-") or label.endswith("-"):
-                    return False
+        validator = _FORMAT_VALIDATORS.get(fmt)
+        if validator is None:
+            # Unknown format: pass
             return True
-
-        if fmt == "ipv4":
-            parts = value.split(".")
-            if len(parts) != 4:
-                return False
-            for part in parts:
-                if not re.match(r"^\d{1,3}$", part):
-                    return False
-                num = int(part)
-                if num < 0 or num > 255:
-                    return False
-                if len(part) > 1 and part.startswith("0"):
-                    return False
-            return True
-
-        if fmt == "ipv6":
-            ipv6_re = (
-                r"^(?:(?:[0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}"
-                r"|(?:[0-9a-fA-F]{1,4}:){1,7}:"
-                r"|(?:[0-9a-fA-F]{1,4}:){1,6}:[0-9a-fA-F]{1,4}"
-                r"|(?:[0-9a-fA-F]{1,4}:){1,5}(?::[0-9a-fA-F]{1,4}){1,2}"
-                r"|(?:[0-9a-fA-F]{1,4}:){1,4}(?::[0-9a-fA-F]{1,4}){1,3}"
-                r"|(?:[0-9a-fA-F]{1,4}:){1,3}(?::[0-9a-fA-F]{1,4}){1,4}"
-                r"|(?:[0-9a-fA-F]{1,4}:){1,2}(?::[0-9a-fA-F]{1,4}){1,5}"
-                r"|[0-9a-fA-F]{1,4}:(?::[0-9a-fA-F]{1,4}){1,6}"
-                r"|:(?:(?::[0-9a-fA-F]{1,4}){1,7}|:)"
-                r"|fe80:(?::[0-9a-fA-F]{0,4}){0,4}%[0-9a-zA-Z]+"
-                r"|::(?:ffff(?::0{1,4})?:)?(?:(?:25[0-5]|(?:2[0-4]|1?[0-9])?[0-9])\.){3}"
-                r"(?:25[0-5]|(?:2[0-4]|1?[0-9])?[0-9])"
-                r"|(?:[0-9a-fA-F]{1,4}:){1,4}:(?:(?:25[0-5]|(?:2[0-4]|1?[0-9])?[0-9])\.){3}"
-                r"(?:25[0-5]|(?:2[0-4]|1?[0-9])?[0-9]))$"
-            )
-            return bool(re.match(ipv6_re, value))
-
-        if fmt == "uuid":
-            return bool(
-                re.match(
-                    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[1-5][0-9a-fA-F]{3}"
-                    r"-[89abAB][0-9a-fA-F]{3}-[0-9a-fA-F]{12}$",
-                    value,
-                )
-            )
-
-        if fmt == "json-pointer":
-            if value == "":
-                return True
-            if not value.startswith("/"):
-                return False
-            return not re.search(r"~(?![01])", value)
-
-        if fmt == "relative-json-pointer":
-            m = re.match(r"^(0|[1-9][0-9]*)(#|/.*)?\Z", value)
-            if not m:
-                return False
-            suffix = m.group(2) or ""
-            if suffix and suffix != "#" and suffix.startswith("/"):
-                return not re.search(r"~(?![01])", suffix)
-            return True
-
-        if fmt == "regex":
-            try:
-                re.compile(value)
-                return True
-            except re.error:
-                return False
-
-        # Unknown format: pass
-        return True
+        return bool(validator(value))
 
     @classmethod
     def _validate_instance(
@@ -412,147 +667,304 @@ class SchemaPatchChecker:
         schema: Any,
         instance: Any,
         at_pointer: str = "",
-    ) -> list[dict[str, str]]:
-        errors: list[dict[str, str]] = []
-
-        def push_err(msg: str) -> None:
-            errors.append({"pointer": at_pointer or "/", "message": msg})
+        memo: Optional[_ValidationMemo] = None,
+    ) -> list[tuple[str, str]]:
+        """Errors of *instance* against *schema* as ``(pointer, message)``.
+
+        With a *memo*, the errors of every container subtree are recorded
+        relative to that subtree, and a later call that reaches the same
+        (schema, container) pair replays them instead of walking it again.
+        The caller must drop a container from the memo (``_memo_forget``)
+        whenever it, or anything below it, is mutated.
+        """
+        errors: list[tuple[str, str]] = []
+        cls._validate_node(schema, instance, at_pointer, [], errors, memo)
+        return errors
 
-        if schema is None or schema is True:
-            return errors
-        if schema is False:
-            push_err('schema "false" does not accept any value')
-            return errors
-        if isinstance(schema, dict) and schema.get("__any"):
-            return errors
+    @classmethod
+    def _validate_node(
+        cls,
+        schema: Any,
+        instance: Any,
+        base: str,
+        path: list[str],
+        errors: Optional[list[tuple[str, str]]],
+        memo: Optional[_ValidationMemo] = None,
+    ) -> None:
+        """Validate *instance* against *schema*, appending to *errors*.
+
+        The instance's location is *base* plus the child tokens in *path*.
+        The walk is an explicit pre-order stack rather than recursion; each
+        frame records the path depth of its parent and its own token, and
+        the shared *path* is cut back to that depth when the frame is
+        popped. The pointer string is only built when an error is recorded,
+        so valid subtrees never pay for pointer formatting. With *errors*
+        set to None the first failure raises :class:`_Invalid` instead
+        (see ``_is_valid``).
+        """
 
-        # anyOf
-        if isinstance(schema, dict) and "anyOf" in schema:
-            any_pass = any(
-                len(cls._validate_instance(s, instance, at_pointer)) == 0
-                for s in schema["anyOf"]
-            )
-            if not any_pass:
-                push_err("failed in anyOf (no alternative accepted the value)")
-            return errors
-
-        # oneOf — exactly one sub-schema must match
-        if isinstance(schema, dict) and "oneOf" in schema:
-            passing = [
-                s for s in schema["oneOf"]
-                if len(cls._validate_instance(s, instance, at_pointer)) == 0
-            ]
-            if len(passing) == 0:
-                push_err("failed in oneOf (no alternative accepted the value)")
-            elif len(passing) > 1:
-                push_err(
-                    f"failed in oneOf (matched {len(passing)} alternatives, "
-                    f"but exactly 1 must match)"
-                )
-            return errors
+        def push_err(msg: str) -> None:
+            if errors is None:
+                raise _Invalid
+            errors.append((_pointer_from(base, path), msg))
+
+        stack: list[tuple[Any, Any, int, Optional[str]]] = [
+            (schema, instance, len(path), None)
+        ]
+        while stack:
+            schema, instance, depth, token = stack.pop()
+            del path[depth:]
+            if token is not None:
+                path.append(token)
+
+            if schema is _DEFERRED_ERROR:
+                # Queued behind earlier siblings to keep error order stable.
+                push_err(instance)
+                continue
+            if schema is _MEMO_END:
+                # The subtree's frames have all run; *path* is its own again.
+                node, node_schema, start = instance
+                raw = base + "/" + "/".join(path) if path else base
+                cut = len(raw)
+                rel = tuple((ptr[cut:], msg) for ptr, msg in errors[start:])
+                entry = memo.get(id(node))
+                if entry is None:
+                    entry = memo[id(node)] = (node, {})
+                entry[1][id(node_schema)] = (node_schema, rel)
+                continue
+            if schema is None or schema is True:
+                continue
+            if schema is False:
+                push_err('schema "false" does not accept any value')
+                continue
+            # Only dict schemas carry keywords; anything else accepts the value.
+            if not isinstance(schema, dict):
+                continue
+            get = schema.get
+            if get("__any"):
+                continue
 
-        # allOf — every sub-schema must match
-        if isinstance(schema, dict) and "allOf" in schema:
-            for s in schema["allOf"]:
-                errors.extend(cls._validate_instance(s, instance, at_pointer))
-            return errors
-
-        # enum
-        if isinstance(schema, dict) and "enum" in schema:
-            ok = any(cls._deep_equal(v, instance) for v in schema["enum"])
-            if not ok:
-                push_err(f"value is not in enum: {json.dumps(instance)}")
-
-        # type check
-        allowed_types = cls._normalize_type(schema.get("type") if isinstance(schema, dict) else None)
-        if allowed_types:
-            inst_type = cls._type_of_instance(instance)
-            # JSON Schema: "integer" is a subtype of "number"
-            type_matches = (
-                inst_type in allowed_types
-                or (inst_type == "integer" and "number" in allowed_types)
-            )
-            if not type_matches:
-                push_err(
-                    f"invalid type: expected {' | '.join(allowed_types)}, "
-                    f"received {inst_type}"
+            if memo is not None and (
+                type(instance) is dict or type(instance) is list
+            ):
+                entry = memo.get(id(instance))
+                hit = entry[1].get(id(schema)) if entry is not None else None
+                if hit is not None and hit[0] is schema:
+                    raw = base + "/" + "/".join(path) if path else base
+                    errors.extend((raw + suffix, msg) for suffix, msg in hit[1])
+                    continue
+                stack.append(
+                    (_MEMO_END, (instance, schema, len(errors)), len(path), None)
                 )
-                return errors
 
-        inst_type = cls._type_of_instance(instance)
+            # anyOf — stop at the first alternative that accepts the value
+            if "anyOf" in schema:
+                for s in schema["anyOf"]:
+                    if cls._is_valid(s, instance, path):
+                        break
+                else:
+                    push_err("failed in anyOf (no alternative accepted the value)")
+                continue
 
-        # string validations
-        if inst_type == "string" and isinstance(schema, dict):
-            if schema.get("pattern"):
-                if not re.search(schema["pattern"], instance):
-                    push_err(
-                        f"string does not match pattern: {schema['pattern']}"
-                    )
-            if schema.get("format"):
-                if not cls._validate_format(schema["format"], instance):
+            # oneOf — exactly one sub-schema must match
+            if "oneOf" in schema:
+                passing = 0
+                for s in schema["oneOf"]:
+                    if cls._is_valid(s, instance, path):
+                        passing += 1
+                if passing == 0:
+                    push_err("failed in oneOf (no alternative accepted the value)")
+                elif passing > 1:
                     push_err(
-                        f"string does not respect format: {schema['format']}"
+                        f"failed in oneOf (matched {passing} alternatives, "
+                        f"but exactly 1 must match)"
                     )
+                continue
 
-        # number/integer validations
-        if inst_type in ("number", "integer") and isinstance(schema, dict):
-            if isinstance(schema.get("minimum"), (int, float)):
-                if not (instance >= schema["minimum"]):
-                    push_err(f"number < minimum ({schema['minimum']})")
-            if isinstance(schema.get("maximum"), (int, float)):
-                if not (instance <= schema["maximum"]):
-                    push_err(f"number > maximum ({schema['maximum']})")
-
-        # array validations
-        if inst_type == "array" and isinstance(schema, dict):
-            if schema.get("items"):
-                for i, item in enumerate(instance):
-                    child_ptr = f"{at_pointer}/{i}"
-                    errors.extend(
-                        cls._validate_instance(schema["items"], item, child_ptr)
-                    )
+            here = len(path)
 
-        # object validations
-        if inst_type == "object" and isinstance(schema, dict):
-            props = schema.get("properties", {})
-            req = schema.get("required", [])
-
-            for r in req:
-                if r not in instance:
-                    errors.append(
-                        {
-                            "pointer": at_pointer or "/",
-                            "message": f"required field missing: {r}",
-                        }
-                    )
+            # allOf — every sub-schema must match
+            if "allOf" in schema:
+                stack.extend(
+                    (s, instance, here, None) for s in reversed(schema["allOf"])
+                )
+                continue
 
-            for k, v in instance.items():
-                if k in props:
-                    errors.extend(
-                        cls._validate_instance(
-                            props[k], v, f"{at_pointer}/{k}"
-                        )
+            # enum
+            if "enum" in schema:
+                if not cls._enum_contains(schema["enum"], instance):
+                    push_err(f"value is not in enum: {json.dumps(instance)}")
+
+            # type check
+            inst_type = cls._type_of_instance(instance)
+            allowed_types = cls._normalize_type(get("type"))
+            if allowed_types:
+                # JSON Schema: "integer" is a subtype of "number"
+                type_matches = (
+                    inst_type in allowed_types
+                    or (inst_type == "integer" and "number" in allowed_types)
+                )
+                if not type_matches:
+                    push_err(
+                        f"invalid type: expected {' | '.join(allowed_types)}, "
+                        f"received {inst_type}"
                     )
-                else:
-                    ap = schema.get("additionalProperties")
-                    if ap is False:
-                        errors.append(
-                            {
-                                "pointer": f"{at_pointer}/{k}" or "/",
-                                "message": (
-                                    f"property not allowed "
+                    continue
+
+            # string validations
+            if inst_type == "string":
+                pattern = get("pattern")
+                if pattern:
+                    if not _pattern_matcher(pattern)(instance):
+                        push_err(f"string does not match pattern: {pattern}")
+                fmt = get("format")
+                if fmt:
+                    if not cls._validate_format(fmt, instance):
+                        push_err(f"string does not respect format: {fmt}")
+
+            # number/integer validations
+            elif inst_type == "number" or inst_type == "integer":
+                minimum = get("minimum")
+                if isinstance(minimum, (int, float)):
+                    if not (instance >= minimum):
+                        push_err(f"number < minimum ({minimum})")
+                maximum = get("maximum")
+                if isinstance(maximum, (int, float)):
+                    if not (instance <= maximum):
+                        push_err(f"number > maximum ({maximum})")
+
+            # array validations
+            elif inst_type == "array":
+                items = get("items")
+                if items:
+                    for i in range(len(instance) - 1, -1, -1):
+                        stack.append((items, instance[i], here, str(i)))
+
+            # object validations
+            elif inst_type == "object":
+                props = get("properties", {})
+                req = get("required", [])
+
+                for r in req:
+                    if r not in instance:
+                        push_err(f"required field missing: {r}")
+
+                ap = get("additionalProperties")
+                children: list[tuple[Any, Any, int, Optional[str]]] = []
+                for k, v in instance.items():
+                    if k in props:
+                        children.append((props[k], v, here, str(k)))
+                    elif ap is False:
+                        children.append(
+                            (
+                                _DEFERRED_ERROR,
+                                (
+                                    "property not allowed "
                                     f"(additionalProperties=false): {k}"
                                 ),
-                            }
-                        )
-                    elif ap and ap is not True:
-                        errors.extend(
-                            cls._validate_instance(
-                                ap, v, f"{at_pointer}/{k}"
+                                here,
+                                str(k),
                             )
                         )
+                    elif ap and ap is not True:
+                        children.append((ap, v, here, str(k)))
+                children.reverse()
+                stack.extend(children)
 
-        return errors
+    @classmethod
+    def _is_valid(cls, schema: Any, instance: Any, path: list[str]) -> bool:
+        """True if *instance* satisfies *schema*; stops at the first error.
+
+        Used for anyOf/oneOf branches, whose individual errors are never
+        reported, so no error dicts or pointers are built for them.
+        """
+        depth = len(path)
+        try:
+            cls._validate_node(schema, instance, "", path, None)
+        except _Invalid:
+            return False
+        finally:
+            # Drop the tokens the walk left behind so the caller's
+            # location is intact.
+            del path[depth:]
+        return True
+
+    @staticmethod
+    def _memo_forget(memo: _ValidationMemo, doc: Any, tokens: list[str]) -> None:
+        """Drop every container from *doc* down to the parent of *tokens*."""
+        if not memo:
+            return
+        # Descends exactly like _walk, so the containers dropped are the
+        # ones the op is about to touch.
+        cur = doc
+        for t in tokens:
+            memo.pop(id(cur), None)
+            if type(cur) is list:
+                try:
+                    idx = int(t)
+                except (ValueError, TypeError):
+                    return
+                if idx < 0 or idx >= len(cur):
+                    return
+                cur = cur[idx]
+            elif type(cur) is dict:
+                if t not in cur:
+                    return
+                cur = cur[t]
+            else:
+                return
+
+    @classmethod
+    def _memo_append(cls, memo: _ValidationMemo, array: list[Any]) -> None:
+        """Extend the memo entry of *array* with the item just appended.
+
+        An array's errors are its type error or those of its items in
+        order, so the new item's errors go last. Schemas that judge the
+        array as a whole (combinators, enum) drop the entry instead.
+        """
+        entry = memo.get(id(array))
+        if entry is None:
+            return
+        by_schema = entry[1]
+        token = str(len(array) - 1)
+        for schema_id, (schema, rel) in list(by_schema.items()):
+            if (
+                "anyOf" in schema
+                or "oneOf" in schema
+                or "allOf" in schema
+                or "enum" in schema
+            ):
+                del memo[id(array)]
+                return
+            allowed_types = cls._normalize_type(schema.get("type"))
+            items = schema.get("items")
+            if not items or (allowed_types and "array" not in allowed_types):
+                continue
+            item_errors: list[tuple[str, str]] = []
+            cls._validate_node(items, array[-1], "", [token], item_errors, memo)
+            by_schema[schema_id] = (schema, rel + tuple(item_errors))
+
+    @classmethod
+    def _prepare_schema(cls, root_schema: Any) -> tuple[Any, dict[str, Any]]:
+        """Return ``(inlined_schema, base_doc)`` for *root_schema*, cached.
+
+        The agent validates every patch batch of a run against the same
+        schema object, so ``$ref`` inlining and the base document are
+        computed once per schema. Schemas are treated as immutable: a
+        schema mutated in place after first use keeps its prepared form.
+        """
+        cache = cls._PREPARED_CACHE
+        key = id(root_schema)
+        entry = cache.get(key)
+        if entry is not None and entry[0] is root_schema:
+            return entry[1], entry[2]
+
+        inlined = cls._inline_refs(root_schema, root_schema)
+        base_doc = cls._build_base_doc_from_schema(inlined)
+        if len(cache) >= cls._PREPARED_CACHE_MAX:
+            del cache[next(iter(cache))]
+        cache[key] = (root_schema, inlined, base_doc)
+        return inlined, base_doc
 
     @classmethod
     def _build_base_doc_from_schema(cls, schema: Any) -> dict[str, Any]:
@@ -576,10 +988,44 @@ class SchemaPatchChecker:
 
         return base
 
+    @classmethod
+    def _cached_candidates(
+        cls, schema: Any, prop_name: Optional[str]
+    ) -> list[Any]:
+        """Candidates for *prop_name* (or an array item if None), memoized.
+
+        Only dict schemas are cached; the other cases are constant-time.
+        """
+        if not isinstance(schema, dict):
+            if prop_name is None:
+                return cls._index_candidates(schema)
+            return cls._property_candidates(schema, prop_name)
+        cache = cls._CANDIDATE_CACHE
+        key = (id(schema), prop_name)
+        entry = cache.get(key)
+        if entry is not None and entry[0] is schema:
+            return entry[1]
+        if prop_name is None:
+            result = cls._index_candidates(schema)
+        else:
+            result = cls._property_candidates(schema, prop_name)
+        if len(cache) >= cls._CANDIDATE_CACHE_MAX:
+            cache.clear()
+        cache[key] = (schema, result)
+        return result
+
     @classmethod
     def _schema_candidates_for_property(
         cls, schema: Any, prop_name: str
     ) -> list[Any]:
+        return cls._cached_candidates(schema, prop_name)
+
+    @classmethod
+    def _schema_candidates_for_index(cls, schema: Any) -> list[Any]:
+        return cls._cached_candidates(schema, None)
+
+    @classmethod
+    def _property_candidates(cls, schema: Any, prop_name: str) -> list[Any]:
         if schema is None or schema is True:
             return [cls._ANY_SCHEMA]
         if schema is False:
@@ -620,7 +1066,7 @@ class SchemaPatchChecker:
         return [ap]
 
     @classmethod
-    def _schema_candidates_for_index(cls, schema: Any) -> list[Any]:
+    def _index_candidates(cls, schema: Any) -> list[Any]:
         if schema is None or schema is True:
             return [cls._ANY_SCHEMA]
         if schema is False:
@@ -646,174 +1092,113 @@ class SchemaPatchChecker:
         return [cls._ANY_SCHEMA]
 
     @classmethod
-    def _schema_at_pointer_candidates(
-        cls, root_schema: Any, tokens: list[str]
+    def _step_schema_candidates(
+        cls, root_schema: Any, candidates: list[Any], t: str
     ) -> list[Any]:
-        candidates = [root_schema]
-        for t in tokens:
-            next_candidates: list[Any] = []
-            for s in candidates:
-                s = cls._resolve_ref(s, root_schema)
-                types = cls._normalize_type(
-                    s.get("type") if isinstance(s, dict) else None
-                )
-                could_be_array = s and (
-                    (isinstance(s, dict) and s.get("__any"))
-                    or not types
-                    or "array" in types
-                )
-                could_be_object = s and (
-                    (isinstance(s, dict) and s.get("__any"))
-                    or not types
-                    or "object" in types
-                )
+        """Sub-schema candidates one token below *candidates*."""
+        next_candidates: list[Any] = []
+        for s in candidates:
+            s = cls._resolve_ref(s, root_schema)
+            types = cls._normalize_type(
+                s.get("type") if isinstance(s, dict) else None
+            )
+            could_be_array = s and (
+                (isinstance(s, dict) and s.get("__any"))
+                or not types
+                or "array" in types
+            )
+            could_be_object = s and (
+                (isinstance(s, dict) and s.get("__any"))
+                or not types
+                or "object" in types
+            )
 
-                if t != "-" and re.match(r"^[0-9]+$", t) and could_be_array:
-                    resolved = [
-                        cls._resolve_ref(c, root_schema)
-                        for c in cls._schema_candidates_for_index(s)
-                    ]
-                    next_candidates.extend(resolved)
-                    continue
-                if could_be_object:
-                    resolved = [
-                        cls._resolve_ref(c, root_schema)
-                        for c in cls._schema_candidates_for_property(s, t)
-                    ]
-                    next_candidates.extend(resolved)
+            if t != "-" and _is_digits(t) and could_be_array:
+                resolved = [
+                    cls._resolve_ref(c, root_schema)
+                    for c in cls._schema_candidates_for_index(s)
+                ]
+                next_candidates.extend(resolved)
+                continue
+            if could_be_object:
+                resolved = [
+                    cls._resolve_ref(c, root_schema)
+                    for c in cls._schema_candidates_for_property(s, t)
+                ]
+                next_candidates.extend(resolved)
 
-            candidates = next_candidates if next_candidates else [cls._ANY_SCHEMA]
-        # Final resolution of candidates
-        return [cls._resolve_ref(c, root_schema) for c in candidates]
+        return next_candidates if next_candidates else [cls._ANY_SCHEMA]
 
     @classmethod
-    def _apply_json_patch(
-        cls, doc: Any, patch_ops: list[dict[str, Any]]
+    def _apply_op(
+        cls, current: Any, op: dict[str, Any], tokens: list[str]
     ) -> Any:
-        current = cls._clone(doc)
+        """Apply *op*, whose path parses to *tokens*, to *current* in place.
+
+        Returns the document, which is a new object when the op targets
+        the root. Every op except ``move`` fails before touching the
+        document, so it may be applied in place without losing atomicity.
+        """
+        parent, key, exists, value = cls._walk(current, tokens)
 
-        def ensure_container_for_add(
-            parent: Any, key: str, value: Any
-        ) -> Any:
-            nonlocal current
+        op_name = op["op"]
+
+        if op_name == "add" or op_name == "replace":
+            new_value = _json_clone(op.get("value"))
             if parent is None:
-                return cls._clone(value)
-            if isinstance(parent, list):
-                idx = len(parent) if key == "-" else int(key)
-                if not isinstance(idx, int) or idx < 0 or idx > len(parent):
-                    raise ValueError(f"add in array: invalid index: {key}")
-                parent.insert(idx, value)
-                return current
-            if not cls._is_object(parent):
-                raise ValueError("add: parent is not object/array at path")
-            parent[key] = value
-            return current
-
-        def set_value(
-            parent: Any, key: str, value: Any, op_path: str
-        ) -> Any:
-            nonlocal current
+                current = new_value
+            elif op_name == "add":
+                _add_in(parent, key, new_value)
+            else:
+                _set_in(parent, key, new_value, op["path"])
+        elif op_name == "remove":
             if parent is None:
-                return cls._clone(value)
-            if isinstance(parent, list):
-                idx = int(key)
-                if idx < 0 or idx >= len(parent):
-                    raise ValueError(
-                        f"replace failed: {op_path} does not exist"
-                    )
-                parent[idx] = value
-                return current
-            if not cls._is_object(parent):
+                current = None
+            else:
+                _remove_in(parent, key, op["path"])
+        elif op_name == "test":
+            if not exists:
                 raise ValueError(
-                    "replace: parent is not object/array at path"
+                    f"test failed: {op['path']} does not exist"
                 )
-            if key not in parent:
+            if not cls._deep_equal(value, op.get("value")):
                 raise ValueError(
-                    f"replace failed: {op_path} does not exist"
+                    f"test failed: value differs at {op['path']}"
                 )
-            parent[key] = value
-            return current
-
-        def remove_value(
-            parent: Any, key: str, op_path: str
-        ) -> Any:
-            nonlocal current
-            if parent is None:
-                return None
-            if isinstance(parent, list):
-                idx = int(key)
-                if idx < 0 or idx >= len(parent):
-                    raise ValueError(
-                        f"remove failed: {op_path} does not exist"
-                    )
-                parent.pop(idx)
-                return current
-            if not cls._is_object(parent):
+        elif op_name == "copy":
+            from_tokens = cls._parse_json_pointer(op["from"])
+            _, _, src_exists, src_value = cls._walk(current, from_tokens)
+            if not src_exists:
                 raise ValueError(
-                    "remove: parent is not object/array at path"
+                    f"copy failed: from={op['from']} does not exist"
                 )
-            if key not in parent:
+            new_value = _json_clone(src_value)
+            if parent is None:
+                current = new_value
+            else:
+                _add_in(parent, key, new_value)
+        elif op_name == "move":
+            from_tokens = cls._parse_json_pointer(op["from"])
+            from_parent, from_key, src_exists, src_value = cls._walk(
+                current, from_tokens
+            )
+            if not src_exists:
                 raise ValueError(
-                    f"remove failed: {op_path} does not exist"
-                )
-            del parent[key]
-            return current
-
-        for op in patch_ops:
-            tokens = cls._parse_json_pointer(op["path"])
-            pk = cls._get_parent_and_key(current, tokens)
-            parent, key = pk["parent"], pk["key"]
-
-            op_name = op["op"]
-
-            if op_name == "add":
-                current = ensure_container_for_add(
-                    parent, key, cls._clone(op.get("value"))
-                )
-            elif op_name == "replace":
-                current = set_value(
-                    parent, key, cls._clone(op.get("value")), op["path"]
-                )
-            elif op_name == "remove":
-                current = remove_value(parent, key, op["path"])
-            elif op_name == "test":
-                result = cls._get_at(current, tokens)
-                if not result["exists"]:
-                    raise ValueError(
-                        f"test failed: {op['path']} does not exist"
-                    )
-                if not cls._deep_equal(result["value"], op.get("value")):
-                    raise ValueError(
-                        f"test failed: value differs at {op['path']}"
-                    )
-            elif op_name == "copy":
-                from_tokens = cls._parse_json_pointer(op["from"])
-                src = cls._get_at(current, from_tokens)
-                if not src["exists"]:
-                    raise ValueError(
-                        f"copy failed: from={op['from']} does not exist"
-                    )
-                current = ensure_container_for_add(
-                    parent, key, cls._clone(src["value"])
-                )
-            elif op_name == "move":
-                from_tokens = cls._parse_json_pointer(op["from"])
-                src = cls._get_at(current, from_tokens)
-                if not src["exists"]:
-                    raise ValueError(
-                        f"move failed: from={op['from']} does not exist"
-                    )
-                from_pk = cls._get_parent_and_key(current, from_tokens)
-                current = remove_value(
-                    from_pk["parent"], from_pk["key"], op["from"]
-                )
-                dst_tokens = cls._parse_json_pointer(op["path"])
-                dst_pk = cls._get_parent_and_key(current, dst_tokens)
-                current = ensure_container_for_add(
-                    dst_pk["parent"], dst_pk["key"], cls._clone(src["value"])
+                    f"move failed: from={op['from']} does not exist"
                 )
+            if from_parent is None:
+                current = None
+            else:
+                _remove_in(from_parent, from_key, op["from"])
+            # The removal may have shifted the destination; walk again.
+            dst_parent, dst_key, _, _ = cls._walk(current, tokens)
+            new_value = _json_clone(src_value)
+            if dst_parent is None:
+                current = new_value
             else:
-                raise ValueError(f"Operation not supported: {op_name}")
+                _add_in(dst_parent, dst_key, new_value)
+        else:
+            raise ValueError(f"Operation not supported: {op_name}")
 
         return current
 
@@ -824,13 +1209,20 @@ class SchemaPatchChecker:
         initial_doc: Any,
         patch_ops: list[dict[str, Any]],
     ) -> dict[str, Any]:
+        """Dry-run *patch_ops* on *initial_doc* and validate against *root_schema*.
+
+        Prepared schemas are cached process-wide by ``id(root_schema)``;
+        mutating a schema in place after it has been passed here gives stale
+        results, so pass a new schema object instead.
+        """
         errors: list[dict[str, Any]] = []
         # Pre-resolve all $ref in the schema so all validation works correctly
         if root_schema and isinstance(root_schema, dict):
-            root_schema = cls._inline_refs(root_schema, root_schema)
-        base_doc = cls._build_base_doc_from_schema(root_schema) if root_schema else {}
+            root_schema, base_doc = cls._prepare_schema(root_schema)
+        else:
+            base_doc = cls._build_base_doc_from_schema(root_schema) if root_schema else {}
         merged = {**base_doc, **(initial_doc or {})} if isinstance(initial_doc, dict) else (initial_doc or {})
-        doc = cls._clone(merged)
+        doc = _json_clone(merged)
 
         def add_err(
             op_index: int,
@@ -850,6 +1242,36 @@ class SchemaPatchChecker:
         def op_needs_value(op_name: str) -> bool:
             return op_name in ("add", "replace", "test")
 
+        def reject_malformed(i: int, op: Any) -> bool:
+            """Record an error and return True if *op* lacks required fields."""
+            if not isinstance(op, dict):
+                add_err(i, op, "/", "invalid operation (not an object)")
+                return True
+            if not isinstance(op.get("op"), str) or not isinstance(
+                op.get("path"), str
+            ):
+                add_err(i, op, "/", "invalid operation (missing op/path)")
+                return True
+            if op_needs_value(op["op"]) and "value" not in op:
+                add_err(
+                    i,
+                    op,
+                    op["path"],
+                    f'operation "{op["op"]}" requires field "value"',
+                )
+                return True
+            if op["op"] in ("move", "copy") and not isinstance(
+                op.get("from"), str
+            ):
+                add_err(
+                    i,
+                    op,
+                    op["path"],
+                    f'operation "{op["op"]}" requires field "from"',
+                )
+                return True
+            return False
+
         if root_schema is None:
 
             def ensure_parent_chain_for_add(
@@ -861,30 +1283,24 @@ class SchemaPatchChecker:
                 for i in range(len(tokens) - 1):
                     t = tokens[i]
                     nxt = tokens[i + 1]
-                    next_is_index = nxt == "-" or re.match(r"^[0-9]+$", nxt)
+                    next_is_index = nxt == "-" or _is_digits(nxt)
 
-                    if isinstance(cur, list):
-                        idx = len(cur) if t == "-" else int(t)
-                        if not isinstance(idx, int) or idx < 0 or idx > len(cur):
+                    if type(cur) is list:
+                        n = len(cur)
+                        idx = n if t == "-" else int(t)
+                        if idx < 0 or idx > n:
                             raise ValueError(
                                 f"add in array: invalid index: {t}"
                             )
-                        if idx == len(cur):
+                        if idx == n:
                             cur.append([] if next_is_index else {})
-                        elif (
-                            cur[idx] is None
-                            or not isinstance(cur[idx], (dict, list))
-                        ):
+                        elif type(cur[idx]) not in (dict, list):
                             cur[idx] = [] if next_is_index else {}
                         cur = cur[idx]
                         continue
 
-                    if cls._is_object(cur):
-                        if (
-                            t not in cur
-                            or cur[t] is None
-                            or not isinstance(cur[t], (dict, list))
-                        ):
+                    if type(cur) is dict:
+                        if t not in cur or type(cur[t]) not in (dict, list):
                             cur[t] = [] if next_is_index else {}
                         cur = cur[t]
                         continue
@@ -893,68 +1309,53 @@ class SchemaPatchChecker:
                 return base
 
             for i, op in enumerate(patch_ops):
-                if not isinstance(op, dict):
-                    add_err(i, op, "/", "invalid operation (not an object)")
-                    continue
-                if not isinstance(op.get("op"), str) or not isinstance(
-                    op.get("path"), str
-                ):
-                    add_err(i, op, "/", "invalid operation (missing op/path)")
-                    continue
-                if op_needs_value(op["op"]) and "value" not in op:
-                    add_err(
-                        i,
-                        op,
-                        op["path"],
-                        f'operation "{op["op"]}" requires field "value"',
-                    )
-                    continue
-                if op["op"] in ("move", "copy") and not isinstance(
-                    op.get("from"), str
-                ):
-                    add_err(
-                        i,
-                        op,
-                        op["path"],
-                        f'operation "{op["op"]}" requires field "from"',
-                    )
+                if reject_malformed(i, op):
                     continue
                 try:
+                    tokens = cls._parse_json_pointer(op["path"])
                     if op["op"] == "add":
-                        tokens = cls._parse_json_pointer(op["path"])
                         doc = ensure_parent_chain_for_add(doc, tokens)
-                    doc = cls._apply_json_patch(doc, [op])
+                    doc = cls._apply_op(_json_clone(doc), op, tokens)
                 except Exception as e:
                     add_err(i, op, op["path"], f"failed to apply patch: {e}")
 
             return {"ok": len(errors) == 0, "errors": errors, "finalDoc": doc}
 
+        # Schema candidates per token path, shared across the batch and
+        # computed only by the checks that read them (copy and move read
+        # none). The lists are read-only.
+        candidates_at: dict[tuple[str, ...], list[Any]] = {}
+
+        def schemas_at(path: tuple[str, ...]) -> list[Any]:
+            found = candidates_at.get(path)
+            if found is not None:
+                return found
+            # Start from the deepest cached prefix and cache every level on
+            # the way down; sibling pointers then share the walk.
+            depth = len(path) - 1
+            while depth >= 0 and path[:depth] not in candidates_at:
+                depth -= 1
+            if depth < 0:
+                found = [cls._resolve_ref(root_schema, root_schema)]
+                candidates_at[()] = found
+                depth = 0
+            else:
+                found = candidates_at[path[:depth]]
+            for end in range(depth + 1, len(path) + 1):
+                found = [
+                    cls._resolve_ref(c, root_schema)
+                    for c in cls._step_schema_candidates(
+                        root_schema, found, path[end - 1]
+                    )
+                ]
+                candidates_at[path[:end]] = found
+            return found
+
+        # Ops are applied in place, so the post-operation check only
+        # re-walks the containers on each op's path.
+        post_memo: _ValidationMemo = {}
         for i, op in enumerate(patch_ops):
-            if not isinstance(op, dict):
-                add_err(i, op, "/", "invalid operation (not an object)")
-                continue
-            if not isinstance(op.get("op"), str) or not isinstance(
-                op.get("path"), str
-            ):
-                add_err(i, op, "/", "invalid operation (missing op/path)")
-                continue
-            if op_needs_value(op["op"]) and "value" not in op:
-                add_err(
-                    i,
-                    op,
-                    op["path"],
-                    f'operation "{op["op"]}" requires field "value"',
-                )
-                continue
-            if op["op"] in ("move", "copy") and not isinstance(
-                op.get("from"), str
-            ):
-                add_err(
-                    i,
-                    op,
-                    op["path"],
-                    f'operation "{op["op"]}" requires field "from"',
-                )
+            if reject_malformed(i, op):
                 continue
 
             try:
@@ -963,21 +1364,11 @@ class SchemaPatchChecker:
                 add_err(i, op, op["path"], str(e))
                 continue
 
-            target = cls._get_at(doc, tokens)
-            pk = cls._get_parent_and_key(doc, tokens)
-            parent, key = pk["parent"], pk["key"]
-            parent_tokens = tokens[:-1] if tokens else []
-
-            schema_at_target = cls._schema_at_pointer_candidates(
-                root_schema, tokens
-            )
-            schema_at_parent = cls._schema_at_pointer_candidates(
-                root_schema, parent_tokens
-            )
+            parent, key, target_exists, target_value = cls._walk(doc, tokens)
 
             # existence check for replace/remove/test
             if op["op"] in ("replace", "remove", "test"):
-                if not target["exists"]:
+                if not target_exists:
                     add_err(
                         i,
                         op,
@@ -998,9 +1389,9 @@ class SchemaPatchChecker:
                     )
                     continue
 
-                if len(tokens) > 0 and isinstance(parent, list):
+                if len(tokens) > 0 and type(parent) is list:
                     valid_idx = key == "-" or (
-                        re.match(r"^[0-9]+$", str(key))
+                        _is_digits(key)
                         and 0 <= int(key) <= len(parent)
                     )
                     if not valid_idx:
@@ -1014,11 +1405,11 @@ class SchemaPatchChecker:
                         )
                         continue
 
-                if len(tokens) > 0 and cls._is_object(parent):
-                    prop_allowed = any(
-                        cls._is_prop_allowed(s, key) for s in schema_at_parent
-                    )
-                    if not prop_allowed:
+                if len(tokens) > 0 and type(parent) is dict:
+                    for s in schemas_at(tuple(tokens[:-1])):
+                        if cls._is_prop_allowed(s, key):
+                            break
+                    else:
                         add_err(
                             i,
                             op,
@@ -1032,33 +1423,16 @@ class SchemaPatchChecker:
                 # If the target path already holds an array and the value
                 # being added is NOT an array, the model almost certainly
                 # meant to append a single item — not replace the array.
-                if target["exists"] and isinstance(target["value"], list):
-                    val = op.get("value")
-                    existing_len = len(target["value"])
-                    if not isinstance(val, list):
-                        add_err(
-                            i,
-                            op,
-                            op["path"],
-                            f"DESTRUCTIVE OVERWRITE BLOCKED: path \"{op['path']}\" currently holds "
-                            f"an array with {existing_len} items. Your \"add\" would REPLACE the "
-                            f"entire array with a single {cls._type_of_instance(val)}. "
-                            f"To APPEND an item, use \"{op['path']}/-\" as the path instead. "
-                            f'Example: {{"op":"add","path":"{op["path"]}/-","value":...}}',
-                        )
-                        continue
-                    else:
-                        add_err(
-                            i,
-                            op,
-                            op["path"],
-                            f"DESTRUCTIVE OVERWRITE BLOCKED: path \"{op['path']}\" currently holds "
-                            f"an array with {existing_len} items. Your \"add\" would REPLACE all "
-                            f"existing data with a new array of {len(val)} items. "
-                            f"To APPEND items, use separate operations with \"{op['path']}/-\" for each item. "
-                            f'Example: [{{"op":"add","path":"{op["path"]}/-","value":item1}}, ...]',
-                        )
-                        continue
+                if target_exists and isinstance(target_value, list):
+                    add_err(
+                        i,
+                        op,
+                        op["path"],
+                        cls._destructive_overwrite_message(
+                            op["path"], len(target_value), op.get("value")
+                        ),
+                    )
+                    continue
 
             # remove validation
             if op["op"] == "remove":
@@ -1070,11 +1444,12 @@ class SchemaPatchChecker:
                         "remove at root leaves the document undefined (incompatible with schema)",
                     )
                     continue
-                if cls._is_object(parent):
-                    would_remove_required = any(
-                        cls._is_required_by_schema(s, key)
-                        for s in schema_at_parent
-                    )
+                if type(parent) is dict:
+                    would_remove_required = False
+                    for s in schemas_at(tuple(tokens[:-1])):
+                        if cls._is_required_by_schema(s, key):
+                            would_remove_required = True
+                            break
                     if would_remove_required:
                         add_err(
                             i,
@@ -1086,40 +1461,26 @@ class SchemaPatchChecker:
 
             # value validation for add/replace
             if op["op"] in ("add", "replace"):
-                value_errors_list = [
-                    cls._validate_instance(s, op.get("value"), op["path"])
-                    for s in schema_at_target
-                ]
-                value_errors_list.sort(key=len)
-                best = value_errors_list[0] if value_errors_list else []
+                schema_at_target = schemas_at(tuple(tokens))
+                best = cls._best_candidate_errors(
+                    schema_at_target, op.get("value"), op["path"]
+                )
                 if len(best) > 0:
                     msgs = " | ".join(
-                        f"{e['pointer']}: {e['message']}" for e in best
+                        f"{ptr}: {msg}" for ptr, msg in best
                     )
                     # Provide actionable hint for common type mismatches
                     hint = ""
-                    val = op.get("value")
-                    val_type = cls._type_of_instance(val)
+                    val_type = cls._type_of_instance(op.get("value"))
+                    if val_type != "object" and val_type != "array":
+                        val_type = ""
                     for s in schema_at_target:
                         s_type = s.get("type") if isinstance(s, dict) else None
-                        if s_type == "array" and val_type == "object":
-                            hint = (
-                                f' HINT: The schema expects an array at "{op["path"]}", '
-                                f"but you provided a single object. "
-                                f'To append this object to the array, use path "{op["path"]}/-" instead.'
-                            )
-                            break
-                        elif s_type == "array" and val_type != "array":
-                            hint = (
-                                f' HINT: The schema expects an array at "{op["path"]}". '
-                                f'To append an item, use path "{op["path"]}/-" with the item as value.'
-                            )
-                            break
-                        elif s_type == "object" and val_type == "array":
-                            hint = (
-                                f' HINT: The schema expects an object at "{op["path"]}", '
-                                f"but you provided an array. Pass a single object as the value."
-                            )
+                        if type(s_type) is not str:
+                            continue
+                        template = _TYPE_MISMATCH_HINTS.get((s_type, val_type))
+                        if template is not None:
+                            hint = template % {"path": op["path"]}
                             break
                     add_err(
                         i,
@@ -1131,15 +1492,12 @@ class SchemaPatchChecker:
 
             # test value validation
             if op["op"] == "test":
-                value_errors_list = [
-                    cls._validate_instance(s, op.get("value"), op["path"])
-                    for s in schema_at_target
-                ]
-                value_errors_list.sort(key=len)
-                best = value_errors_list[0] if value_errors_list else []
+                best = cls._best_candidate_errors(
+                    schemas_at(tuple(tokens)), op.get("value"), op["path"]
+                )
                 if len(best) > 0:
                     msgs = " | ".join(
-                        f"{e['pointer']}: {e['message']}" for e in best
+                        f"{ptr}: {msg}" for ptr, msg in best
                     )
                     add_err(
                         i,
@@ -1151,17 +1509,37 @@ class SchemaPatchChecker:
 
             # apply the patch
             try:
-                doc = cls._apply_json_patch(doc, [op])
+                if op["op"] == "move" or not tokens:
+                    # A failed move can be half-applied, so it runs on a
+                    # copy; either way no container identity survives.
+                    doc = cls._apply_op(_json_clone(doc), op, tokens)
+                    post_memo.clear()
+                else:
+                    # Appends keep the array's own entry and extend it.
+                    appended = (
+                        op["op"] == "add"
+                        and type(parent) is list
+                        and (key == "-" or int(key) == len(parent))
+                    )
+                    if appended:
+                        cls._memo_forget(post_memo, doc, tokens[:-1])
+                    elif op["op"] != "test":
+                        cls._memo_forget(post_memo, doc, tokens)
+                    doc = cls._apply_op(doc, op, tokens)
+                    if appended:
+                        cls._memo_append(post_memo, parent)
             except Exception as e:
                 add_err(i, op, op["path"], f"failed to apply patch: {e}")
                 continue
 
             # post-operation validation
-            post_errors = cls._validate_instance(root_schema, doc, "")
+            post_errors = cls._validate_instance(
+                root_schema, doc, "", post_memo
+            )
             if post_errors:
                 msgs_list = post_errors[:5]
                 msgs = " | ".join(
-                    f"{e['pointer']}: {e['message']}" for e in msgs_list
+                    f"{ptr}: {msg}" for ptr, msg in msgs_list
                 )
                 if len(post_errors) > 5:
                     msgs += " | ..."
@@ -1174,44 +1552,81 @@ class SchemaPatchChecker:
 
         return {"ok": len(errors) == 0, "errors": errors, "finalDoc": doc}
 
+    @classmethod
+    def _destructive_overwrite_message(
+        cls, path: str, existing_len: int, val: Any
+    ) -> str:
+        """Error text for an ``add`` that would replace an existing array."""
+        if not isinstance(val, list):
+            return (
+                f"DESTRUCTIVE OVERWRITE BLOCKED: path \"{path}\" currently holds "
+                f"an array with {existing_len} items. Your \"add\" would REPLACE the "
+                f"entire array with a single {cls._type_of_instance(val)}. "
+                f"To APPEND an item, use \"{path}/-\" as the path instead. "
+                f'Example: {{"op":"add","path":"{path}/-","value":...}}'
+            )
+        return (
+            f"DESTRUCTIVE OVERWRITE BLOCKED: path \"{path}\" currently holds "
+            f"an array with {existing_len} items. Your \"add\" would REPLACE all "
+            f"existing data with a new array of {len(val)} items. "
+            f"To APPEND items, use separate operations with \"{path}/-\" for each item. "
+            f'Example: [{{"op":"add","path":"{path}/-","value":item1}}, ...]'
+        )
+
+    @classmethod
+    def _best_candidate_errors(
+        cls, candidates: list[Any], value: Any, at_pointer: str
+    ) -> list[tuple[str, str]]:
+        """Fewest validation errors of *value* over the candidate schemas.
+
+        Returns as soon as a candidate accepts the value; permissive
+        candidates (``True``, ``{}``, the any-schema) are spotted before any
+        validation runs. Ties go to the earliest candidate.
+        """
+        for s in candidates:
+            if s is True or s is None or (
+                isinstance(s, dict) and (not s or s.get("__any"))
+            ):
+                return []
+        best: list[tuple[str, str]] = []
+        for s in candidates:
+            errs = cls._validate_instance(s, value, at_pointer)
+            if not errs:
+                return errs
+            if not best or len(errs) < len(best):
+                best = errs
+        return best
+
     @classmethod
     def _is_prop_allowed(cls, schema: Any, key: str) -> bool:
-        if schema is None or schema is True:
-            return True
-        if schema is False:
-            return False
-        if isinstance(schema, dict) and schema.get("__any"):
-            return True
-        if isinstance(schema, dict) and ("anyOf" in schema or "oneOf" in schema):
-            return True
-        if isinstance(schema, dict) and "allOf" in schema:
-            # Property is allowed if ANY sub-schema allows it
-            return any(cls._is_prop_allowed(s, key) for s in schema["allOf"])
         if not isinstance(schema, dict):
+            # None and True allow everything, False nothing
+            return schema is not False
+        if schema.get("__any") or "anyOf" in schema or "oneOf" in schema:
             return True
-        ap = schema.get("additionalProperties")
-        props = schema.get("properties", {})
-        if key in props:
-            return True
-        if ap is False:
+        if "allOf" in schema:
+            # Property is allowed if ANY sub-schema allows it
+            for s in schema["allOf"]:
+                if cls._is_prop_allowed(s, key):
+                    return True
             return False
-        return True
+        if key in schema.get("properties", ()):
+            return True
+        return schema.get("additionalProperties") is not False
 
     @classmethod
     def _is_required_by_schema(cls, schema: Any, key: str) -> bool:
-        if schema is None or schema is True:
-            return False
-        if isinstance(schema, dict) and schema.get("__any"):
+        if not isinstance(schema, dict):
             return False
-        if isinstance(schema, dict) and ("anyOf" in schema or "oneOf" in schema):
+        if schema.get("__any") or "anyOf" in schema or "oneOf" in schema:
             return False
-        if isinstance(schema, dict) and "allOf" in schema:
+        if "allOf" in schema:
             # Required if ANY sub-schema requires it
-            return any(cls._is_required_by_schema(s, key) for s in schema["allOf"])
-        if not isinstance(schema, dict):
+            for s in schema["allOf"]:
+                if cls._is_required_by_schema(s, key):
+                    return True
             return False
-        req = schema.get("required", [])
-        return key in req
+        return key in schema.get("required", ())
 
 
 def apply_patches(
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import re
 from typing import Any, Optional
 
 from text_to_json.tools.json_pointer import (
     decode_pointer_token_with_url,
     encode_pointer_token,
+    is_array_index,
 )
 
 
@@ -52,7 +52,7 @@ class JsonInspector:
             next_ptr = f"{walked}/{escaped}"
 
             if cur_type == "array":
-                if not re.match(r"^(0|[1-9]\d*)$", str(token)):
+                if not is_array_index(str(token)):
                     return {
                         "ok": True,
                         "found": False,
@@ -8,6 +8,8 @@ def decode_pointer_token(token: str) -> str:
 
     ``~1`` → ``/`` and ``~0`` → ``~``, applied in the correct order.
     """
+    if "~" not in token:
+        return token
     return token.replace("~1", "/").replace("~0", "~")
 
 
@@ -27,7 +29,10 @@ def encode_pointer_token(token: str) -> str:
 
     ``~`` → ``~0`` and ``/`` → ``~1``, applied in the correct order.
     """
-    return str(token).replace("~", "~0").replace("/", "~1")
+    token = str(token)
+    if "~" not in token and "/" not in token:
+        return token
+    return token.replace("~", "~0").replace("/", "~1")
 
 
 def parse_json_pointer(path: str) -> list[str]:
@@ -44,7 +49,7 @@ def parse_json_pointer(path: str) -> list[str]:
         raise ValueError(
             f'Invalid JSON Pointer (must start with "/"): {path}'
         )
-    return [decode_pointer_token(t) for t in path.split("/")[1:]]
+    return _split_tokens(path)
 
 
 def parse_json_pointer_lenient(path: str) -> list[str]:
@@ -58,7 +63,26 @@ def parse_json_pointer_lenient(path: str) -> list[str]:
         return []
     if not path.startswith("/"):
         path = "/" + path
-    return [decode_pointer_token(t) for t in path.split("/")[1:]]
+    return _split_tokens(path)
+
+
+def _split_tokens(path: str) -> list[str]:
+    """Split a ``/``-prefixed pointer into decoded tokens.
+
+    Most pointers contain no ``~`` escapes at all, in which case the raw
+    split is already the answer and no per-token decoding is needed.
+    """
+    tokens = path.split("/")[1:]
+    if "~" not in path:
+        return tokens
+    return [decode_pointer_token(t) for t in tokens]
+
+
+def is_array_index(token: str) -> bool:
+    """Whether *token* is an RFC 6901 array index: ``0`` or ``[1-9][0-9]*``."""
+    if token == "0":
+        return True
+    return token.isascii() and token.isdigit() and token[0] != "0"
 
 
 def join_pointer(base: str, token: str) -> str:
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import math
-import re
+from itertools import islice
 from typing import Any, Optional
 
-from text_to_json.tools.json_pointer import parse_json_pointer_lenient
+from text_to_json.tools.json_pointer import (
+    is_array_index,
+    parse_json_pointer_lenient,
+)
 
 
 class ReadValue:
@@ -162,7 +165,7 @@ class ReadValue:
                 "ok": False,
                 "error": "Invalid array index '-': not readable for read_value",
             }
-        if not re.match(r"^(0|[1-9]\d*)$", tok):
+        if not is_array_index(tok):
             return {
                 "ok": False,
                 "error": (
@@ -271,11 +274,10 @@ class ReadValue:
             original_length = len(value)
             limit = opts["max_array_items"]
             out = []
-            take = min(original_length, limit)
             nested_changed = False
 
-            for i in range(take):
-                child = cls._sanitize_for_json(value[i], opts, seen, depth + 1)
+            for item in value[:limit]:
+                child = cls._sanitize_for_json(item, opts, seen, depth + 1)
                 if child["truncated"] or (child["notes"] and len(child["notes"]) > 0):
                     nested_changed = True
                 if child["truncated"]:
@@ -303,16 +305,14 @@ class ReadValue:
             }
 
         # object (dict)
-        keys = list(value.keys())
-        original_key_count = len(keys)
+        original_key_count = len(value)
         limit = opts["max_object_keys"]
         out_dict: dict[str, Any] = {}
         take = min(original_key_count, limit)
         nested_changed = False
 
-        for i in range(take):
-            k = keys[i]
-            child = cls._sanitize_for_json(value[k], opts, seen, depth + 1)
+        for k, v in islice(value.items(), take):
+            child = cls._sanitize_for_json(v, opts, seen, depth + 1)
             if child["truncated"] or (child["notes"] and len(child["notes"]) > 0):
                 nested_changed = True
             if child["truncated"]:
@@ -14,6 +14,10 @@ from typing import Any, Literal, Optional
 from text_to_json.tools.json_pointer import join_pointer as _join_pointer_util
 
 
+class _LimitReached(Exception):
+    """Raised by the collectors to unwind the walk once ``limit`` is hit."""
+
+
 class SearchPointer:
     """Faithful port of the n8n SearchPointer class."""
 
@@ -52,6 +56,7 @@ class SearchPointer:
             "query": query,
             "type": search_type,
             "fuzzy": fuzzy,
+            "normalizedQuery": cls._normalize_for_match(query) if fuzzy else "",
             "matches": matches,
             "seen": seen,
             "limit": limit,
@@ -59,7 +64,13 @@ class SearchPointer:
             "maxValueLength": max_value_length,
         }
 
-        cls._visit(root, "", state)
+        if limit <= 0:
+            state["truncated"] = True
+        else:
+            try:
+                cls._visit(root, "", state)
+            except _LimitReached:
+                state["truncated"] = True
 
         result: dict[str, Any] = {
             "matches": matches,
@@ -75,61 +86,70 @@ class SearchPointer:
         return result
 
     @classmethod
-    def _visit(cls, node: Any, ptr: str, state: dict[str, Any]) -> None:
-        if len(state["matches"]) >= state["limit"]:
-            state["truncated"] = True
-            return
-        if node is None or not isinstance(node, (dict, list)):
+    def _visit(cls, root: Any, ptr: str, state: dict[str, Any]) -> None:
+        """Pre-order walk of *root* using an explicit stack of child iterators.
+
+        Each frame is ``(children, pointer, is_dict)``; a container is
+        pushed right after its own key/value have been collected, so matches
+        come out in the same order as a recursive walk.
+        """
+        if not isinstance(root, (dict, list)):
             return
 
-        node_id = id(node)
-        if node_id in state["seen"]:
-            return
-        state["seen"].add(node_id)
-
-        if isinstance(node, list):
-            for i, item in enumerate(node):
-                if len(state["matches"]) >= state["limit"]:
-                    state["truncated"] = True
-                    break
-                child_ptr = cls._join_pointer(ptr, str(i))
-                cls._maybe_collect_value(item, child_ptr, state)
-                cls._visit(item, child_ptr, state)
-            return
-
-        # dict
-        for key in node:
-            if len(state["matches"]) >= state["limit"]:
-                state["truncated"] = True
-                break
-            child_ptr = cls._join_pointer(ptr, key)
-            value = node[key]
-
-            cls._maybe_collect_key(key, child_ptr, state)
-            cls._maybe_collect_value(value, child_ptr, state)
-            cls._visit(value, child_ptr, state)
+        # Every container is walked once: an id stays in *seen* from the
+        # moment its walk starts, so ancestors on the current path break
+        # cycles and finished subtrees reached again through an alias are
+        # skipped instead of re-walked.
+        seen = state["seen"]
+        do_key = state["type"] == "key"
+        join = cls._join_pointer
+        collect_key = cls._maybe_collect_key
+        collect_value = cls._maybe_collect_value
+
+        def frame(node: Any, node_ptr: str) -> tuple[Any, str, bool]:
+            seen.add(id(node))
+            if isinstance(node, dict):
+                return iter(node.items()), node_ptr, True
+            return enumerate(node), node_ptr, False
+
+        stack = [frame(root, ptr)]
+        while stack:
+            children, node_ptr, is_dict = stack[-1]
+            entry = next(children, None)
+            if entry is None:
+                stack.pop()
+                continue
+
+            key, child = entry
+            # Pointers are only built for matches and for containers we
+            # descend into; most leaves never need one.
+            token = key if is_dict else str(key)
+            if do_key:
+                if is_dict:
+                    collect_key(key, node_ptr, token, state)
+            else:
+                collect_value(child, node_ptr, token, state)
+
+            if isinstance(child, (dict, list)) and id(child) not in seen:
+                stack.append(frame(child, join(node_ptr, token)))
 
     @classmethod
     def _maybe_collect_key(
-        cls, key: str, pointer: str, state: dict[str, Any]
+        cls, key: str, parent_ptr: str, token: str, state: dict[str, Any]
     ) -> None:
-        if state["type"] != "key":
-            return
         if not cls._matches_query(str(key), state):
             return
-        if len(state["matches"]) >= state["limit"]:
-            state["truncated"] = True
-            return
-        state["matches"].append({"pointer": pointer, "kind": "key", "key": key})
+        matches = state["matches"]
+        pointer = cls._join_pointer(parent_ptr, token)
+        matches.append({"pointer": pointer, "kind": "key", "key": key})
+        if len(matches) >= state["limit"]:
+            raise _LimitReached
 
     @classmethod
     def _maybe_collect_value(
-        cls, value: Any, pointer: str, state: dict[str, Any]
+        cls, value: Any, parent_ptr: str, token: str, state: dict[str, Any]
     ) -> None:
-        if state["type"] != "value" or not cls._is_primitive(value):
-            return
-        if len(state["matches"]) >= state["limit"]:
-            state["truncated"] = True
+        if not cls._is_primitive(value):
             return
 
         comparable = cls._value_to_comparable_string(value)
@@ -147,26 +167,29 @@ class SearchPointer:
         elif value_type == "bool":
             value_type = "boolean"
 
-        state["matches"].append(
+        matches = state["matches"]
+        matches.append(
             {
-                "pointer": pointer,
+                "pointer": cls._join_pointer(parent_ptr, token),
                 "kind": "value",
                 "value": stored_value,
                 "valueType": value_type,
                 "valueTruncated": value_truncated,
             }
         )
+        if len(matches) >= state["limit"]:
+            raise _LimitReached
 
     @classmethod
     def _matches_query(cls, candidate: str, state: dict[str, Any]) -> bool:
         if not state["fuzzy"]:
             return str(candidate) == state["query"]
-        return cls._fuzzy_match(str(candidate), state["query"])
+        return cls._fuzzy_match_normalized(
+            cls._normalize_for_match(candidate), state["normalizedQuery"]
+        )
 
     @classmethod
-    def _fuzzy_match(cls, a: str, b: str) -> bool:
-        na = cls._normalize_for_match(a)
-        nb = cls._normalize_for_match(b)
+    def _fuzzy_match_normalized(cls, na: str, nb: str) -> bool:
         if na == nb:
             return True
         if na in nb or nb in na:
@@ -178,10 +201,12 @@ class SearchPointer:
         if max_len > 64:
             return False
 
-        dist = cls._levenshtein(na, nb)
         min_len = min(len(na), len(nb))
         threshold = min(3, max(1, -(-int(min_len * 0.34) // 1)))
-        return dist <= threshold
+        # The edit distance is at least the length difference.
+        if max_len - min_len > threshold:
+            return False
+        return cls._levenshtein(na, nb) <= threshold
 
     @staticmethod
     def _normalize_for_match(value: str) -> str:
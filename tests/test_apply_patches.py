@@ -139,6 +139,30 @@ class TestApplyPatchesWithSchema:
         assert result["ok"] is False
         assert any("type" in e["message"] for e in result["errors"])
 
+    @pytest.mark.parametrize("prop_type, value, expected", [
+        ("array", {"a": 1}, 'use path "/items/-" instead'),
+        ("array", "x", 'use path "/items/-" with the item as value'),
+        ("object", [1], "Pass a single object as the value"),
+        ("object", "x", None),
+        ("array", [{}], None),
+    ])
+    def test_type_mismatch_hint(self, prop_type, value, expected):
+        schema = {
+            "type": "object",
+            "properties": {
+                "items": {"type": prop_type, "items": {"type": "string"}},
+            },
+        }
+        result = apply_patches({}, [
+            {"op": "add", "path": "/items", "value": value},
+        ], schema)
+        assert result["ok"] is False
+        message = result["errors"][0]["message"]
+        if expected is None:
+            assert "HINT" not in message
+        else:
+            assert expected in message
+
     def test_additional_properties_false(self, empty_doc):
         schema = {
             "type": "object",
@@ -152,6 +176,17 @@ class TestApplyPatchesWithSchema:
         assert result["ok"] is False
         assert any("not allowed" in e["message"] for e in result["errors"])
 
+    def test_candidate_lookup_cached_per_schema(self):
+        schema = {"type": "object", "properties": {"name": {"type": "string"}}}
+        first = SchemaPatchChecker._schema_candidates_for_property(schema, "name")
+        second = SchemaPatchChecker._schema_candidates_for_property(schema, "name")
+        assert first is second
+        assert first == [{"type": "string"}]
+        other = {"type": "object", "properties": {"name": {"type": "integer"}}}
+        assert SchemaPatchChecker._schema_candidates_for_property(
+            other, "name"
+        ) == [{"type": "integer"}]
+
     def test_required_field_checked_post_op(self, empty_doc, simple_schema):
         # Adding only non-required fields — post-op check will notice
         # missing "name" after each op
@@ -185,6 +220,55 @@ class TestApplyPatchesWithSchema:
         assert result["ok"] is True
         assert len(result["finalDoc"]["items"]) == 2
 
+    def test_post_op_errors_follow_shifted_items(self, array_schema):
+        # The invalid item is validated at /items/1 by the first op; after
+        # the insert its error must be reported at its new index.
+        doc = {"items": [{"id": 1}, {"value": "no id"}]}
+        result = apply_patches(doc, [
+            {"op": "add", "path": "/items/0/value", "value": "x"},
+            {"op": "add", "path": "/items/0", "value": {"id": 0}},
+        ], array_schema)
+        messages = [e["message"] for e in result["errors"]]
+        assert len(messages) == 2
+        assert messages[0].endswith("/items/1: required field missing: id")
+        assert messages[1].endswith("/items/2: required field missing: id")
+
+    def test_post_op_error_cleared_by_later_op(self, array_schema):
+        doc = {"items": [{"id": 1}, {"value": "no id"}]}
+        result = apply_patches(doc, [
+            {"op": "add", "path": "/items/0/value", "value": "x"},
+            {"op": "add", "path": "/items/1/id", "value": 2},
+            {"op": "add", "path": "/items/-", "value": {"id": 3}},
+        ], array_schema)
+        assert [e["opIndex"] for e in result["errors"]] == [0]
+
+    def test_post_op_errors_kept_across_appends(self, array_schema):
+        doc = {"items": [{"id": 1}, {"value": "no id"}]}
+        result = apply_patches(doc, [
+            {"op": "add", "path": "/items/-", "value": {"id": 3}},
+            {"op": "add", "path": "/items/3", "value": {"id": 4}},
+        ], array_schema)
+        assert [e["opIndex"] for e in result["errors"]] == [0, 1]
+        assert all(
+            "/items/1: required field missing: id" in e["message"]
+            for e in result["errors"]
+        )
+        assert len(result["finalDoc"]["items"]) == 4
+
+    def test_append_rechecks_whole_array_enum(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "xs": {"type": "array", "items": {"type": "integer"}, "enum": [[1], [1, 2]]},
+            },
+        }
+        result = apply_patches({"xs": [1]}, [
+            {"op": "add", "path": "/xs/-", "value": 2},
+            {"op": "add", "path": "/xs/-", "value": 3},
+        ], schema)
+        assert [e["opIndex"] for e in result["errors"]] == [1]
+        assert "not in enum" in result["errors"][0]["message"]
+
     def test_array_item_type_mismatch(self, empty_doc, array_schema):
         result = apply_patches(empty_doc, [
             {"op": "add", "path": "/items", "value": []},
@@ -249,6 +333,36 @@ class TestRefResolution:
         ], schema)
         assert result["ok"] is True
 
+    def test_prepared_schema_reused(self, nested_schema):
+        first, _ = SchemaPatchChecker._prepare_schema(nested_schema)
+        second, _ = SchemaPatchChecker._prepare_schema(nested_schema)
+        assert first is second
+        assert "$ref" not in first["properties"]["address"]
+
+    def test_repeated_ref_inlined_once(self):
+        schema = {
+            "definitions": {"Tag": {"type": "string", "enum": ["a", "b"]}},
+            "type": "object",
+            "properties": {
+                "first": {"$ref": "#/definitions/Tag"},
+                "second": {"$ref": "#/definitions/Tag"},
+            },
+        }
+        inlined = SchemaPatchChecker._inline_refs(schema, schema)
+        assert inlined["properties"]["first"] is inlined["properties"]["second"]
+
+    def test_deeply_nested_schema_does_not_recurse(self):
+        schema: dict = {"type": "string"}
+        value: object = 1
+        for _ in range(5000):
+            schema = {"type": "array", "items": schema}
+            value = [value]
+        inlined = SchemaPatchChecker._inline_refs(schema, schema)
+        errors = SchemaPatchChecker._validate_instance(inlined, value)
+        assert len(errors) == 1
+        assert errors[0][0].endswith("/0/0")
+        assert "type" in errors[0][1]
+
 
 # ======================================================================
 # Destructive overwrite detection (in SchemaPatchChecker)
@@ -450,6 +564,7 @@ class TestFormatValidation:
     @pytest.mark.parametrize("value,expected", [
         ("2024-01-15", True),
         ("2024-13-01", False),
+        ("2023-02-29", False),
         ("not-a-date", False),
     ])
     def test_date_format(self, value, expected):
@@ -459,6 +574,9 @@ class TestFormatValidation:
     @pytest.mark.parametrize("value,expected", [
         ("2024-01-15T10:30:00Z", True),
         ("2024-01-15T10:30:00+03:00", True),
+        ("2024-01-15T10:30:00.250Z", True),
+        ("2024-01-15T10:30:00", False),
+        ("2024-01-15T25:30:00Z", False),
         ("not-datetime", False),
     ])
     def test_datetime_format(self, value, expected):
@@ -479,14 +597,47 @@ class TestFormatValidation:
         ("0.0.0.0", True),
         ("256.1.1.1", False),
         ("1.2.3", False),
+        ("01.2.3.4", False),
+        ("1.2.3.x", False),
     ])
     def test_ipv4_format(self, value, expected):
         ok = SchemaPatchChecker._validate_format("ipv4", value)
         assert ok == expected
 
+    @pytest.mark.parametrize("value,expected", [
+        ("example.com", True),
+        ("a-b.c9", True),
+        ("-a.com", False),
+        ("a..b", False),
+        ("a_b.com", False),
+        ("a" * 64 + ".com", False),
+        ("example.com\n", False),
+    ])
+    def test_hostname_format(self, value, expected):
+        ok = SchemaPatchChecker._validate_format("hostname", value)
+        assert ok == expected
+
+    @pytest.mark.parametrize("value,expected", [
+        ("::1", True),
+        ("2001:db8::8a2e:370:7334", True),
+        ("::ffff:192.168.1.1", True),
+        ("1:2:3:4:5:6:1.2.3.4", True),
+        ("1::2::3", False),
+        ("12345::", False),
+        ("fe80::1%eth0", False),
+        ("::1\n", False),
+    ])
+    def test_ipv6_format(self, value, expected):
+        ok = SchemaPatchChecker._validate_format("ipv6", value)
+        assert ok == expected
+
     @pytest.mark.parametrize("value,expected", [
         ("550e8400-e29b-41d4-a716-446655440000", True),
+        ("550E8400-E29B-41D4-A716-446655440000", True),
         ("not-a-uuid", False),
+        ("550e8400-e29b-41d4-a716-44665544000g", False),
+        ("550e8400-e29b-71d4-a716-446655440000", False),
+        ("550e8400-e29b-41d4-a716-4466554400-0", False),
     ])
     def test_uuid_format(self, value, expected):
         ok = SchemaPatchChecker._validate_format("uuid", value)
@@ -529,6 +680,32 @@ class TestEnumValidation:
         assert result["ok"] is False
         assert any("enum" in e["message"] for e in result["errors"])
 
+    @pytest.mark.parametrize("value,expected", [
+        ("a", True),
+        (1, True),
+        (1.0, True),
+        ({"x": 1}, True),
+        ("1", False),
+        ({"x": 2}, False),
+    ])
+    def test_enum_mixed_values(self, value, expected):
+        schema = {"enum": ["a", 1, {"x": 1}]}
+        errors = SchemaPatchChecker._validate_instance(schema, value)
+        assert (len(errors) == 0) == expected
+
+    @pytest.mark.parametrize("value", ["ab", "abc", "k"])
+    def test_non_list_enum_is_not_substring_or_key_match(self, value):
+        for enum in ("abc", {"k": 1}):
+            errors = SchemaPatchChecker._validate_instance({"enum": enum}, value)
+            assert errors
+
+    def test_non_list_enum_rejects_without_raising(self, empty_doc):
+        schema = {"type": "object", "properties": {"code": {"enum": "abc"}}}
+        result = apply_patches(empty_doc, [
+            {"op": "add", "path": "/code", "value": 5},
+        ], schema)
+        assert result["ok"] is False
+
 
 # ======================================================================
 # Number constraints
@@ -566,3 +743,36 @@ class TestNumberConstraints:
             {"op": "add", "path": "/pct", "value": 50.5},
         ], schema)
         assert result["ok"] is True
+
+    @pytest.mark.parametrize("value,expected", [
+        (3, "integer"),
+        (3.0, "integer"),
+        (3.5, "number"),
+        (True, "boolean"),
+        (float("inf"), "number"),
+        (float("nan"), "number"),
+    ])
+    def test_numeric_type_names(self, value, expected):
+        assert SchemaPatchChecker._type_of_instance(value) == expected
+
+
+# ======================================================================
+# String pattern
+# ======================================================================
+class TestPatternValidation:
+
+    @pytest.mark.parametrize("pattern,value,expected", [
+        (".*", "", True),
+        (".+", "", False),
+        (".+", "\n", False),
+        ("^.+", "\nx", False),
+        ("^INV-", "INV-001", True),
+        ("^INV-", "X-INV-001", False),
+        ("INV", "X-INV-001", True),
+        ("^[0-9]{3}$", "123", True),
+        ("^[0-9]{3}$", "12a", False),
+    ])
+    def test_pattern(self, pattern, value, expected):
+        schema = {"type": "string", "pattern": pattern}
+        errors = SchemaPatchChecker._validate_instance(schema, value)
+        assert (len(errors) == 0) == expected
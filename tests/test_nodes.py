@@ -50,6 +50,12 @@ class TestCountNestedItems:
         # 1 + 2 + 3 + "X" = 4 leaf values
         assert _count_nested_items(doc) == 4
 
+    def test_deeply_nested_does_not_recurse(self):
+        doc: dict = {"v": 1}
+        for _ in range(5000):
+            doc = {"child": [doc]}
+        assert _count_nested_items(doc) == 1
+
 
 # ======================================================================
 # _resolve_path
@@ -101,6 +107,29 @@ class TestResolvePath:
         found, _ = _resolve_path(doc, "/items/5")
         assert found is False
 
+    def test_negative_index(self):
+        doc = {"items": [1, 2]}
+        found, _ = _resolve_path(doc, "/items/-1")
+        assert found is False
+
+    @pytest.mark.parametrize("token", ["²", "١"])
+    def test_non_ascii_digit_index(self, token):
+        doc = {"items": [1, 2]}
+        found, _ = _resolve_path(doc, f"/items/{token}")
+        assert found is False
+
+    def test_escaped_tokens(self):
+        doc = {"a/b": {"c~d": 7}}
+        found, value = _resolve_path(doc, "/a~1b/c~0d")
+        assert found is True
+        assert value == 7
+
+    def test_missing_leading_slash(self):
+        doc = {"a": {"b": 1}}
+        found, value = _resolve_path(doc, "a/b")
+        assert found is True
+        assert value == 1
+
 
 # ======================================================================
 # _pre_validate_patches
@@ -121,6 +150,7 @@ class TestPreValidatePatches:
         ], {})
         assert len(errors) == 1
         assert "must start with" in errors[0]["message"]
+        assert errors[0]["code"] == "INVALID_POINTER"
 
     def test_add_on_existing_array(self):
         doc = {"items": [1, 2, 3]}
@@ -145,6 +175,7 @@ class TestPreValidatePatches:
         ], doc)
         assert len(errors) == 1
         assert "DESTRUCTIVE" in errors[0]["message"]
+        assert errors[0]["code"] == "DESTRUCTIVE_ROOT_ADD"
 
     def test_replace_container_array(self):
         doc = {"items": [1, 2, 3, 4, 5]}
@@ -153,6 +184,7 @@ class TestPreValidatePatches:
         ], doc)
         assert len(errors) == 1
         assert "DESTRUCTIVE REPLACE" in errors[0]["message"]
+        assert errors[0]["code"] == "DESTRUCTIVE_REPLACE"
 
     def test_type_downgrade_object_to_scalar(self):
         doc = {"meta": {"a": 1, "b": 2}}
@@ -161,6 +193,7 @@ class TestPreValidatePatches:
         ], doc)
         assert len(errors) == 1
         assert "TYPE DOWNGRADE" in errors[0]["message"]
+        assert errors[0]["code"] == "TYPE_DOWNGRADE"
 
     def test_remove_array_container(self):
         doc = {"items": [1, 2, 3]}
@@ -169,6 +202,7 @@ class TestPreValidatePatches:
         ], doc)
         assert len(errors) == 1
         assert "DATA LOSS" in errors[0]["message"]
+        assert errors[0]["code"] == "DATA_LOSS_WARNING"
 
     def test_remove_leaf_allowed(self):
         doc = {"items": [1, 2, 3]}
@@ -269,3 +303,23 @@ class TestTrimMessages:
         human = HumanMessage(content="chunk")
         result = _trim_messages([sys, human])
         assert result is None
+
+    def test_keeps_most_recent_rounds_in_order(self):
+        sys = SystemMessage(content="system")
+        human = HumanMessage(content="chunk")
+        rounds = []
+        for n in range(4):
+            rounds.append(AIMessage(content=f"ai {n}", tool_calls=[
+                {"name": "inspect_keys", "args": {}, "id": f"c{n}"},
+            ]))
+            rounds.append(ToolMessage(content=f"tool {n}", tool_call_id=f"c{n}"))
+        messages = [sys, human] + rounds
+
+        result = _trim_messages(messages, keep_last_n_rounds=2)
+        assert [m.content for m in result[3:]] == ["ai 2", "tool 2", "ai 3", "tool 3"]
+
+        # Trimming again drops the previously injected summary
+        result2 = _trim_messages(result, keep_last_n_rounds=1)
+        assert [m.content for m in result2[:2]] == ["system", "chunk"]
+        assert sum(1 for m in result2 if "CONTEXT TRIMMED" in m.content) == 1
+        assert result2[-1].content == "tool 3"
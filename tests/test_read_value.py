@@ -105,6 +105,11 @@ class TestReadValueErrors:
         result = read_value(doc, {"path": "/tags/-"})
         assert result["found"] is False
 
+    @pytest.mark.parametrize("token", ["01", "+1", "1 ", "1\n", "١"])
+    def test_non_canonical_index_rejected(self, doc, token):
+        result = read_value(doc, {"path": f"/tags/{token}"})
+        assert result["found"] is False
+
 
 class TestReadValueTruncation:
     """Test truncation limits."""
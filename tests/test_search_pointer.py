@@ -55,6 +55,16 @@ class TestValueSearch:
         result = search_pointer(sample_doc, {"query": "e", "type": "value", "fuzzy_match": True, "limit": 1})
         assert result["count"] <= 1
 
+    def test_limit_reached_marks_truncated(self, sample_doc):
+        result = search_pointer(sample_doc, {"query": "label", "type": "key", "limit": 2})
+        assert result["count"] == 2
+        assert result["truncated"] is True
+
+    def test_limit_not_reached_not_truncated(self, sample_doc):
+        result = search_pointer(sample_doc, {"query": "label", "type": "key", "limit": 10})
+        assert result["count"] == 3
+        assert result["truncated"] is False
+
 
 class TestKeySearch:
     """Search by key."""
@@ -130,3 +140,29 @@ class TestEmptyDocument:
         result = search_pointer(doc, {"query": "", "type": "value"})
         # Empty string should match empty string values only
         assert isinstance(result["count"], int)
+
+
+class TestCycles:
+    """Self-referencing structures must not recurse forever."""
+
+    def test_cyclic_document(self):
+        doc = {"name": "loop"}
+        doc["self"] = doc
+        result = search_pointer(doc, {"query": "loop", "type": "value"})
+        assert result["count"] == 1
+        assert result["matches"][0]["pointer"] == "/name"
+
+    def test_deeply_nested_does_not_recurse(self):
+        doc: dict = {"leaf": "bottom"}
+        for _ in range(5000):
+            doc = {"child": doc}
+        result = search_pointer(doc, {"query": "bottom", "type": "value"})
+        assert result["count"] == 1
+        assert result["matches"][0]["pointer"].endswith("/child/leaf")
+
+    def test_aliased_containers_walked_once(self):
+        doc: dict = {"leaf": "bottom"}
+        for _ in range(40):
+            doc = {"left": doc, "right": doc}
+        result = search_pointer(doc, {"query": "bottom", "type": "value"})
+        assert result["count"] == 1
@@ -9,13 +9,14 @@ import pytest
 from text_to_json.misc.truncator import Truncator, TruncatorConfig
 
 
-@pytest.fixture
+# Truncator keeps no state between calls, so one instance per module is safe.
+@pytest.fixture(scope="module")
 def truncator():
     """Truncator with default config."""
     return Truncator()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def small_config_truncator():
     """Truncator with aggressive truncation settings."""
     return Truncator(TruncatorConfig(
@@ -70,6 +71,32 @@ class TestTruncateWithLimit:
         result = truncator.truncate_with_limit(data, limit)
         assert len(result) <= limit + 50  # Allow some margin for final formatting
 
+    def test_input_not_mutated(self, small_config_truncator):
+        data = {"items": list(range(50)), "text": "a" * 200}
+        snapshot = json.dumps(data)
+        small_config_truncator.truncate_with_limit(data, 60)
+        assert json.dumps(data) == snapshot
+
+    def test_deep_containers_capped(self):
+        truncator = Truncator(TruncatorConfig(max_depth=2))
+        data = {"a": {"b": {"c": [1, 2]}}, "x": 1}
+        result = truncator.truncate_with_limit(data, 60)
+        assert '"b": "[~MaxDepth]"' in result
+        assert '"c"' not in result
+        assert data["a"]["b"] == {"c": [1, 2]}
+
+    def test_deep_data_within_limit_unchanged(self, truncator):
+        data = {"sections": [{"fields": [{"value": {"address": {"geo": {"lat": 1}}}}]}]}
+        result = truncator.truncate_with_limit(data, 6000)
+        assert "[~MaxDepth]" not in result
+        assert json.loads(result) == data
+
+    def test_depth_cap_disabled(self):
+        truncator = Truncator(TruncatorConfig(max_depth=None))
+        data = {"a": {"b": {"c": {"d": {"e": {"f": {"g": 1}}}}}}}
+        result = truncator.truncate_with_limit(data, 10)
+        assert "[~MaxDepth]" not in result
+
     def test_empty_dict(self, truncator):
         result = truncator.truncate_with_limit({}, 100)
         assert result == "{}"
@@ -102,3 +129,8 @@ class TestCustomStringify:
         result = truncator._custom_stringify({"arr": [1, 2], "obj": {"x": 1}})
         assert '"arr"' in result
         assert '"obj"' in result
+
+    def test_memo_matches_uncached(self, truncator):
+        shared = {"k": [1, 2]}
+        data = {"a": shared, "b": [shared, shared]}
+        assert truncator._custom_stringify(data, 0, {}) == truncator._custom_stringify(data)